@@ -0,0 +1,108 @@
+'''
+Python callbacks and invalidated areas per frame for per-property animations
+(one lv.anim_t and anim_*_cb style callback per property, as generated for
+gui_guider.py) versus anim_batch.BatchAnim.
+
+Run from this directory with the lv_micropython unix port:
+
+    micropython bench_anim.py
+
+OBJECTS objects each animate x, y, width and height together. Frames are
+stepped by hand: the animations are applied with lv.anim_refr_now(), the
+display's pending invalid areas are counted, then the frame is rendered.
+'''
+
+import sys
+sys.path.append('../generated')
+
+import utime as time
+import lvgl as lv
+import headless
+import anim_batch
+
+OBJECTS = 8
+TIME_MS = 1000
+FRAMES = TIME_MS // anim_batch.FRAME_MS + 2
+
+disp = headless.init()
+calls = [0]
+
+
+def set_x(obj, v):
+    calls[0] += 1
+    obj.set_x(v)
+
+
+def set_y(obj, v):
+    calls[0] += 1
+    obj.set_y(v)
+
+
+def set_width(obj, v):
+    calls[0] += 1
+    obj.set_width(v)
+
+
+def set_height(obj, v):
+    calls[0] += 1
+    obj.set_height(v)
+
+
+def per_property(objs):
+    for obj in objs:
+        for cb, start, end in ((set_x, 0, 150), (set_y, 0, 200),
+                               (set_width, 20, 80), (set_height, 20, 60)):
+            a = lv.anim_t()
+            a.init()
+            a.set_var(obj)
+            a.set_values(start, end)
+            a.set_time(TIME_MS)
+            a.set_path_cb(lv.anim_t.path_ease_in_out)
+            a.set_custom_exec_cb(lambda a, v, obj=obj, cb=cb: cb(obj, v))
+            a.start()
+    return lambda: calls[0]
+
+
+def batched(objs):
+    anims = []
+    for obj in objs:
+        anims.append(anim_batch.BatchAnim(obj, TIME_MS, path_cb=lv.anim_t.path_ease_in_out)
+                     .add(anim_batch.X, 0, 150).add(anim_batch.Y, 0, 200)
+                     .add(anim_batch.WIDTH, 20, 80).add(anim_batch.HEIGHT, 20, 60)
+                     .start())
+    return lambda: sum(a.calls for a in anims)
+
+
+def run(name, start):
+    scr = lv.obj()
+    lv.scr_load(scr)
+    objs = [lv.obj(scr) for _ in range(OBJECTS)]
+    lv.refr_now(disp)
+    calls[0] = 0
+    t0 = time.ticks_us()
+    count = start(objs)
+    setup_us = time.ticks_diff(time.ticks_us(), t0)
+    invalid = 0
+    anim_us = 0
+    frame_us = 0
+    for _ in range(FRAMES):
+        lv.tick_inc(anim_batch.FRAME_MS)
+        t0 = time.ticks_us()
+        lv.anim_refr_now()
+        anim_us += time.ticks_diff(time.ticks_us(), t0)
+        # Position and size reach the display as invalidated areas when the
+        # layout is updated, which refr_now would otherwise do itself.
+        scr.update_layout()
+        invalid += disp.inv_p
+        lv.refr_now(disp)
+        frame_us += time.ticks_diff(time.ticks_us(), t0)
+    print('%-13s %9.1f %9.1f %8d %9d %7d' % (name, count() / FRAMES, invalid / FRAMES,
+          anim_us // FRAMES, frame_us // FRAMES, setup_us))
+    lv.anim_del_all()
+    scr.delete()
+
+
+print('%d objects x 4 properties, %d frames' % (OBJECTS, FRAMES))
+print('%-13s %9s %9s %8s %9s %7s' % ('variant', 'calls/fr', 'inval/fr', 'anim_us', 'frame_us', 'setup_us'))
+run('per-property', per_property)
+run('batched', batched)
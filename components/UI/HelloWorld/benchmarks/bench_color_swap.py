@@ -0,0 +1,84 @@
+'''
+Benchmark of the pixel conversion done by open_png: the RGBA8888 ->
+BGRA8888 channel swap for 32-bit builds and the RGBA8888 -> RGB565 + alpha
+conversion for 16-bit builds.
+
+Run from this directory with the lv_micropython unix port:
+
+    micropython bench_color_swap.py [image.png]
+
+Without an argument a synthetic 240x280 frame is swapped. With a PNG file
+the lodepng decode is timed as well, so the figures are per decoded image.
+'''
+
+import sys
+sys.path.append('../generated')
+
+import utime as time
+import lvgl as lv
+import imagetools
+
+WIDTH = 240
+HEIGHT = 280
+ROUNDS = 3
+
+
+def swap_per_pixel(img_view):
+    # The original open_png loop, kept as the baseline.
+    for i in range(0, len(img_view), lv.color_t.__SIZE__):
+        ch = lv.color_t.__cast__(img_view[i:i]).ch
+        ch.red, ch.blue = ch.blue, ch.red
+
+
+def decode_png(path):
+    import lodepng as png
+    with open(path, 'rb') as f:
+        data = f.read()
+    t0 = time.ticks_us()
+    decoded = png.C_Pointer()
+    width = png.C_Pointer()
+    height = png.C_Pointer()
+    error = png.decode32(decoded, width, height, data, len(data))
+    if error:
+        raise RuntimeError(png.error_text(error))
+    t_decode = time.ticks_diff(time.ticks_us(), t0)
+    size = width.int_val * height.int_val * 4
+    return decoded.ptr_val.__dereference__(size), width.int_val * height.int_val, t_decode
+
+
+def run(name, fn, img_view, pixels, t_decode):
+    best = None
+    for _ in range(ROUNDS):
+        t0 = time.ticks_us()
+        fn(img_view)
+        t = time.ticks_diff(time.ticks_us(), t0)
+        if best is None or t < best:
+            best = t
+    per_mp = (best + t_decode) * 1000000 // pixels
+    print('%-12s %8d us/image %10d us/MP' % (name, best + t_decode, per_mp))
+
+
+def main():
+    if len(sys.argv) > 1:
+        img_view, pixels, t_decode = decode_png(sys.argv[1])
+        print('%s: %d pixels, decode32 %d us' % (sys.argv[1], pixels, t_decode))
+    else:
+        pixels = WIDTH * HEIGHT
+        img_view = memoryview(bytearray(pixels * 4))
+        t_decode = 0
+        print('synthetic %dx%d frame' % (WIDTH, HEIGHT))
+
+    run('per-pixel', swap_per_pixel, img_view, pixels, t_decode)
+    run('python', imagetools.swap_red_blue_python, img_view, pixels, t_decode)
+    if imagetools._swap_red_blue_native is not None:
+        run('viper', imagetools.swap_red_blue, img_view, pixels, t_decode)
+    else:
+        print('viper        not available on this build')
+
+    # Runs last: it compacts the buffer in place.
+    run('565 python', lambda v: imagetools.rgba8888_to_rgb565a8_python(v, True), img_view, pixels, t_decode)
+    if imagetools._rgba8888_to_rgb565a8_native is not None:
+        run('565 viper', lambda v: imagetools.rgba8888_to_rgb565a8(v, True), img_view, pixels, t_decode)
+
+
+main()
@@ -0,0 +1,45 @@
+'''
+Import time and heap cost of gui_guider, from source or from .mpy bytecode.
+
+Run from this directory with the lv_micropython unix port, once per variant
+(each run must be a fresh interpreter):
+
+    micropython bench_import.py                  # compile ../generated/*.py
+    micropython bench_import.py ../generated/mpy # load tools/build_mpy.py output
+
+peak_bytes is everything the import allocates, measured with the garbage
+collector disabled so no temporary is freed before it is counted: the heap
+the import needs at its high point. Compiling from source shows up here.
+retained_bytes is what stays allocated after the import and a collection:
+the module's code objects and globals plus the styles and caches it builds,
+which are the same for both variants. If the import runs out of memory with
+collection disabled, raise the heap size (micropython -X heapsize=8M).
+'''
+
+import sys
+import gc
+import uos as os
+import utime as time
+
+mpy_dir = sys.argv[1] if len(sys.argv) > 1 else None
+sys.path.append('../generated')
+if mpy_dir is not None:
+    sys.path.insert(0, mpy_dir)
+
+# Asset paths in gui_guider.py are relative to the generated directory.
+os.chdir('../generated')
+import lvgl as lv
+
+gc.collect()
+before = gc.mem_alloc()
+gc.disable()
+start = time.ticks_us()
+import gui_guider
+elapsed = time.ticks_diff(time.ticks_us(), start)
+peak = gc.mem_alloc() - before
+gc.enable()
+gc.collect()
+retained = gc.mem_alloc() - before
+
+print('%-20s %10s %12s %14s' % ('variant', 'import_ms', 'peak_bytes', 'retained_bytes'))
+print('%-20s %10.1f %12d %14d' % (mpy_dir or 'source', elapsed / 1000, peak, retained))
@@ -0,0 +1,90 @@
+'''
+Asset size, load time and draw time of run-length encoded .rle images versus
+the raw LVGL .bin they were converted from.
+
+Convert the images first, matching the color depth of the port. The stock
+unix port is 32-bit; compress_images.py writes 16-bit pixels by default, for
+the board and a port built with tools/build_simulator.py:
+
+    python3 ../tools/compress_images.py ../generated/MicroPython --color-depth 32
+    micropython bench_rle.py
+
+Every .bin in generated/MicroPython with a .rle next to it is shown as a path
+source ("Z:...") on an offscreen display, once per format. A .rle written
+for another color depth is not decoded by the port and is reported as
+skipped instead of timed:
+
+    load_us    set_src on a new lv.img, header read included
+    first_us   first draw (the .rle is read and parsed here)
+    draw_us    average of DRAWS further redraws of the image
+'''
+
+import sys
+sys.path.append('../generated')
+
+import uos as os
+import utime as time
+
+DRAWS = 20
+
+# Asset paths in gui_guider.py are relative to the generated directory.
+os.chdir('../generated')
+import lvgl as lv
+import headless
+import gui_guider
+import rle_image
+
+disp = headless.init()
+
+
+def draw(img):
+    t0 = time.ticks_us()
+    img.invalidate()
+    lv.refr_now(disp)
+    return time.ticks_diff(time.ticks_us(), t0)
+
+
+def rle_mismatch(name):
+    # Bytes per pixel of a .rle the port cannot draw, else None.
+    with open(name, 'rb') as f:
+        header = rle_image.read_header(f.read(rle_image.HEADER_SIZE))
+    if header is None or gui_guider.TRUE_COLOR_PX_SIZE.get(header[0]) != header[1]:
+        return header[1] if header is not None else 0
+    return None
+
+
+def run(scr, name):
+    if name.endswith('.rle'):
+        px = rle_mismatch(name)
+        if px is not None:
+            print('%-40s skipped: %d bytes per pixel, not for LV_COLOR_DEPTH %d'
+                  % (name, px, gui_guider.COLOR_SIZE * 8))
+            return
+    path = 'Z:' + name
+    gui_guider.image_index.pop(path, None)
+    gui_guider.rle_images.clear()
+    t0 = time.ticks_us()
+    img = lv.img(scr)
+    img.set_src(path)
+    load_us = time.ticks_diff(time.ticks_us(), t0)
+    first_us = draw(img)
+    total = 0
+    for _ in range(DRAWS):
+        total += draw(img)
+    img.delete()
+    print('%-40s %8d %8d %9d %8d' % (name, os.stat(name)[6], load_us, first_us, total // DRAWS))
+
+
+scr = lv.obj()
+lv.scr_load(scr)
+lv.refr_now(disp)
+print('%-40s %8s %8s %9s %8s' % ('image', 'bytes', 'load_us', 'first_us', 'draw_us'))
+for file in sorted(os.listdir('MicroPython')):
+    if file.endswith('.bin'):
+        rle = file[:-4] + '.rle'
+        try:
+            os.stat('MicroPython/' + rle)
+        except OSError:
+            continue
+        run(scr, 'MicroPython/' + file)
+        run(scr, 'MicroPython/' + rle)
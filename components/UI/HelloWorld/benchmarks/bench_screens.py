@@ -0,0 +1,281 @@
+'''
+Headless benchmark of the generated gui_guider.py screens.
+
+Runs the real screen factories on an offscreen display, replays a scripted
+session (button press, gesture-left to screen_1, scr_load_anim back) on a
+virtual clock, and reports:
+
+    import_ms          import of gui_guider (fonts, styles, decoders)
+    first_frame_ms     ui.load('screen') until the first frame is flushed
+    transition_frames  frames rendered during each 200 ms MOVE_LEFT
+    transition_fps     those frames divided by the wall time spent on them
+    heap_peak          heap high-water mark above the post-import level
+    alloc_bytes        bytes allocated during the session (what drives gc)
+
+LVGL time only advances by the scripted steps, so the sequence of frames is
+the same on every run and only the wall-clock figures vary. Every step (and
+every scripted screen load) runs after a collection with the collector
+disabled, so nothing it allocates is freed before the heap is read: the
+heap at the end of the step is its high-water mark. The collections are
+left out of the wall-clock figures. No SDL display is needed. Run from this
+directory:
+
+    micropython bench_screens.py [--json out.json] [--baseline base.json] [--tolerance 20]
+
+The run fails (exit status 1) when one of the scripted transitions did not
+happen. With --baseline it also fails when a time or memory figure is worse
+than the baseline by more than the tolerance in percent, or when a
+transition measured in the baseline is missing.
+'''
+
+import sys
+sys.path.append('../generated')
+
+import gc
+import uos as os
+import utime as time
+import ujson as json
+
+STEP_MS = 5
+SIZE = (240, 280)
+
+
+def parse_args(argv):
+    args = {'json': None, 'baseline': None, 'tolerance': 20}
+    i = 1
+    while i < len(argv):
+        key = argv[i].lstrip('-')
+        if key not in args or i + 1 >= len(argv):
+            raise SystemExit('usage: bench_screens.py [--json out.json] [--baseline base.json] [--tolerance 20]')
+        args[key] = argv[i + 1]
+        i += 2
+    args['tolerance'] = int(args['tolerance'])
+    return args
+
+
+class ScriptedPointer:
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.pressed = False
+
+    def read(self, indev_drv, data):
+        data.point.x = self.x
+        data.point.y = self.y
+        data.state = lv.INDEV_STATE.PRESSED if self.pressed else lv.INDEV_STATE.RELEASED
+        return False
+
+    def press(self, x, y):
+        self.x = x
+        self.y = y
+        self.pressed = True
+
+    def move(self, x, y):
+        self.x = x
+        self.y = y
+
+    def release(self):
+        self.pressed = False
+
+
+class Bench:
+
+    def __init__(self, gui):
+        self.gui = gui
+        self.now = 0
+        self.wall_us = 0
+        self.flushes = 0
+        self.heap_base = 0
+        self.heap_peak = 0
+        self.alloc_bytes = 0
+        self.gc_us = 0
+        self.transitions = []
+        self.missing = []
+        self.pending = None
+
+    def flush(self, disp_drv, area, color_p):
+        self.flushes += 1
+        disp_drv.flush_ready()
+
+    def on_load(self, old, new):
+        # Screen switches animate MOVE_LEFT for 200 ms after a 200 ms delay
+        # (gesture) or immediately (scripted swap); see step().
+        self.pending = (old, new, self.now)
+
+    def measured(self, fn, *args):
+        '''
+        Call fn(*args) with the collector disabled and record its heap
+        high-water mark. Returns the wall time of the call in us.
+        '''
+        t0 = time.ticks_us()
+        gc.collect()
+        self.gc_us += time.ticks_diff(time.ticks_us(), t0)
+        start = gc.mem_alloc()
+        gc.disable()
+        try:
+            t0 = time.ticks_us()
+            fn(*args)
+            dt = time.ticks_diff(time.ticks_us(), t0)
+        finally:
+            end = gc.mem_alloc()
+            gc.enable()
+        self.alloc_bytes += end - start
+        if end - self.heap_base > self.heap_peak:
+            self.heap_peak = end - self.heap_base
+        return dt
+
+    def step(self):
+        lv.tick_inc(STEP_MS)
+        self.now += STEP_MS
+        frames = self.gui.event_stats.frames
+        dt = self.measured(lv.timer_handler)
+        self.wall_us += dt
+        return self.gui.event_stats.frames - frames, dt
+
+    def run(self, ms, script=()):
+        '''
+        Advance ms of virtual time, firing script entries (offset_ms, fn).
+        '''
+        start = self.now
+        script = list(script)
+        while self.now < start + ms:
+            while script and script[0][0] <= self.now - start:
+                script.pop(0)[1]()
+            self.step()
+
+    def transition(self, old, new, anim_start_delay, anim_ms):
+        '''
+        Run through the screen transition from old to new and record frames
+        and wall time spent during the animation itself. A transition that
+        was not started is recorded in missing.
+        '''
+        pending = self.pending
+        self.pending = None
+        if pending is None or pending[0] != old or pending[1] != new:
+            self.missing.append('%s -> %s' % (old, new))
+            return
+        t_load = pending[2]
+        while self.now < t_load + anim_start_delay:
+            self.step()
+        frames = 0
+        wall = 0
+        while self.now < t_load + anim_start_delay + anim_ms:
+            f, dt = self.step()
+            frames += f
+            wall += dt
+        fps = frames * 1000000 // wall if wall else 0
+        self.transitions.append({'from': old, 'to': new, 'frames': frames, 'wall_us': wall, 'fps': fps})
+
+
+def compare(results, baseline, tolerance):
+    failed = []
+    for key in ('import_ms', 'first_frame_ms', 'heap_peak', 'session_wall_ms'):
+        base = baseline.get(key)
+        if base and results[key] > base * (100 + tolerance) // 100:
+            failed.append('%s: %d > %d (+%d%%)' % (key, results[key], base, tolerance))
+    measured = {(t['from'], t['to']): t for t in results['transitions']}
+    for base in baseline.get('transitions', []):
+        name = '%s -> %s' % (base['from'], base['to'])
+        t = measured.get((base['from'], base['to']))
+        if t is None:
+            failed.append('transition %s: not measured' % name)
+        elif t['fps'] < base['fps'] * (100 - tolerance) // 100:
+            failed.append('transition %s fps: %d < %d (-%d%%)' % (name, t['fps'], base['fps'], tolerance))
+    return failed
+
+
+args = parse_args(sys.argv)
+baseline = None
+if args['baseline']:
+    with open(args['baseline']) as f:
+        baseline = json.load(f)
+json_out = args['json']
+if json_out and not json_out.startswith('/'):
+    json_out = '../benchmarks/' + json_out
+# Asset paths in gui_guider.py are relative to the generated directory.
+os.chdir('../generated')
+import lvgl as lv
+
+gc.collect()
+t0 = time.ticks_us()
+import gui_guider
+import_us = time.ticks_diff(time.ticks_us(), t0)
+
+bench = Bench(gui_guider)
+pointer = ScriptedPointer()
+gui_guider.init_display(bench.flush, pointer.read)
+gui_guider.ui.on_load = bench.on_load
+gc.collect()
+bench.heap_base = gc.mem_alloc()
+
+
+def first_frame():
+    gui_guider.ui.load('screen')
+    lv.refr_now(None)
+
+
+# Startup: build the first screen and render it.
+first_frame_us = bench.measured(first_frame)
+bench.pending = None
+
+session_t0 = time.ticks_us()
+session_gc_us = bench.gc_us
+# Press and release screen_btn_1 (22,191 100x50).
+bench.run(300, [
+    (0, lambda: pointer.press(72, 216)),
+    (150, pointer.release),
+])
+# Swipe left across screen: the gesture handler loads screen_1 with
+# MOVE_LEFT, 200 ms animation after a 200 ms delay.
+bench.run(120, [
+    (0, lambda: pointer.press(200, 140)),
+    (20, lambda: pointer.move(160, 140)),
+    (40, lambda: pointer.move(110, 140)),
+    (60, lambda: pointer.move(60, 140)),
+    (80, lambda: pointer.move(30, 140)),
+    (100, pointer.release),
+])
+bench.transition('screen', 'screen_1', 200, 200)
+bench.run(200)
+# Scripted swap straight back with scr_load_anim, no delay.
+bench.measured(gui_guider.ui.load, 'screen', lv.SCR_LOAD_ANIM.MOVE_LEFT, 200, 0)
+bench.transition('screen_1', 'screen', 0, 200)
+bench.run(200)
+session_wall_us = time.ticks_diff(time.ticks_us(), session_t0) - (bench.gc_us - session_gc_us)
+
+results = {
+    'import_ms': import_us // 1000,
+    'first_frame_ms': first_frame_us // 1000,
+    'session_wall_ms': session_wall_us // 1000,
+    'heap_peak': bench.heap_peak,
+    'alloc_bytes': bench.alloc_bytes,
+    'frames': gui_guider.event_stats.frames,
+    'flushes': bench.flushes,
+    'event_dispatches': gui_guider.event_stats.total,
+    'transitions': bench.transitions,
+    'missing_transitions': bench.missing,
+}
+
+print('import          %6d ms' % results['import_ms'])
+print('first frame     %6d ms' % results['first_frame_ms'])
+for t in bench.transitions:
+    print('%-8s -> %-8s %3d frames %6d us  %4d fps' % (t['from'], t['to'], t['frames'], t['wall_us'], t['fps']))
+print('session         %6d ms wall, %d frames, %d flushes, %d Python event dispatches' % (
+    results['session_wall_ms'], results['frames'], results['flushes'], results['event_dispatches']))
+print('heap peak       %6d bytes, %d bytes allocated' % (results['heap_peak'], results['alloc_bytes']))
+for name in bench.missing:
+    print('MISSING transition', name)
+
+if json_out:
+    with open(json_out, 'w') as f:
+        json.dump(results, f)
+
+failed = False
+if baseline is not None:
+    regressions = compare(results, baseline, args['tolerance'])
+    for line in regressions:
+        print('REGRESSION', line)
+    failed = bool(regressions)
+if failed or bench.missing:
+    sys.exit(1)
@@ -0,0 +1,124 @@
+'''
+Heap and call count of per-widget local styles versus shared lv.style_t
+objects, using the label and button property sets of gui_guider.py.
+
+Run from this directory with the lv_micropython unix port:
+
+    micropython bench_styles.py
+
+Each variant builds one screen with the widgets of the generated "screen"
+(one button, two labels) repeated REPEAT times.
+'''
+
+import sys
+sys.path.append('../generated')
+
+import gc
+import utime as time
+import lvgl as lv
+import headless
+
+REPEAT = 10
+SELECTOR = lv.PART.MAIN | lv.STATE.DEFAULT
+
+headless.init()
+font = lv.font_default()
+
+
+def label_local(parent):
+    obj = lv.label(parent)
+    obj.set_style_border_width(0, SELECTOR)
+    obj.set_style_radius(0, SELECTOR)
+    obj.set_style_text_color(lv.color_hex(0x000000), SELECTOR)
+    obj.set_style_text_font(font, SELECTOR)
+    obj.set_style_text_opa(255, SELECTOR)
+    obj.set_style_text_letter_space(2, SELECTOR)
+    obj.set_style_text_line_space(0, SELECTOR)
+    obj.set_style_text_align(lv.TEXT_ALIGN.CENTER, SELECTOR)
+    obj.set_style_bg_opa(0, SELECTOR)
+    obj.set_style_pad_top(0, SELECTOR)
+    obj.set_style_pad_right(0, SELECTOR)
+    obj.set_style_pad_bottom(0, SELECTOR)
+    obj.set_style_pad_left(0, SELECTOR)
+    obj.set_style_shadow_width(0, SELECTOR)
+    return 14
+
+
+def btn_local(parent):
+    obj = lv.btn(parent)
+    obj.set_style_bg_opa(255, SELECTOR)
+    obj.set_style_bg_color(lv.color_hex(0x2195f6), SELECTOR)
+    obj.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, SELECTOR)
+    obj.set_style_border_width(0, SELECTOR)
+    obj.set_style_radius(5, SELECTOR)
+    obj.set_style_shadow_width(0, SELECTOR)
+    obj.set_style_text_color(lv.color_hex(0xffffff), SELECTOR)
+    obj.set_style_text_font(font, SELECTOR)
+    obj.set_style_text_opa(255, SELECTOR)
+    obj.set_style_text_align(lv.TEXT_ALIGN.CENTER, SELECTOR)
+    return 10
+
+
+style_label = lv.style_t()
+style_label.init()
+style_label.set_border_width(0)
+style_label.set_radius(0)
+style_label.set_text_color(lv.color_hex(0x000000))
+style_label.set_text_opa(255)
+style_label.set_text_letter_space(2)
+style_label.set_text_line_space(0)
+style_label.set_text_align(lv.TEXT_ALIGN.CENTER)
+style_label.set_bg_opa(0)
+style_label.set_pad_top(0)
+style_label.set_pad_right(0)
+style_label.set_pad_bottom(0)
+style_label.set_pad_left(0)
+style_label.set_shadow_width(0)
+
+style_btn = lv.style_t()
+style_btn.init()
+style_btn.set_bg_opa(255)
+style_btn.set_bg_color(lv.color_hex(0x2195f6))
+style_btn.set_bg_grad_dir(lv.GRAD_DIR.NONE)
+style_btn.set_border_width(0)
+style_btn.set_radius(5)
+style_btn.set_shadow_width(0)
+style_btn.set_text_color(lv.color_hex(0xffffff))
+style_btn.set_text_font(font)
+style_btn.set_text_opa(255)
+style_btn.set_text_align(lv.TEXT_ALIGN.CENTER)
+
+
+def label_shared(parent):
+    obj = lv.label(parent)
+    obj.add_style(style_label, SELECTOR)
+    obj.set_style_text_font(font, SELECTOR)
+    return 2
+
+
+def btn_shared(parent):
+    obj = lv.btn(parent)
+    obj.add_style(style_btn, SELECTOR)
+    return 1
+
+
+def build(name, label_fn, btn_fn):
+    gc.collect()
+    free = gc.mem_free()
+    t0 = time.ticks_us()
+    scr = lv.obj()
+    calls = 0
+    for _ in range(REPEAT):
+        calls += btn_fn(scr)
+        calls += label_fn(scr)
+        calls += label_fn(scr)
+    scr.update_layout()
+    t = time.ticks_diff(time.ticks_us(), t0)
+    gc.collect()
+    used = free - gc.mem_free()
+    print('%-7s %6d bytes/screen %5d style calls %7d us' % (name, used // REPEAT, calls // REPEAT, t // REPEAT))
+    scr.delete()
+
+
+build('local', label_local, btn_local)
+build('shared', label_shared, btn_shared)
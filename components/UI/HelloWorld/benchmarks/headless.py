@@ -0,0 +1,29 @@
+'''
+Offscreen LVGL display for the benchmarks: flush_cb only acknowledges the
+flush, so everything up to the pixel push is exercised without SDL.
+'''
+
+import lvgl as lv
+
+_refs = []
+
+
+def _flush(disp_drv, area, color_p):
+    disp_drv.flush_ready()
+
+
+def init(w=240, h=280, flush_cb=None):
+    lv.init()
+    buf = bytearray(w * h * lv.color_t.__SIZE__)
+    draw_buf = lv.disp_draw_buf_t()
+    draw_buf.init(buf, None, w * h)
+    disp_drv = lv.disp_drv_t()
+    disp_drv.init()
+    disp_drv.draw_buf = draw_buf
+    disp_drv.flush_cb = flush_cb or _flush
+    disp_drv.hor_res = w
+    disp_drv.ver_res = h
+    disp = disp_drv.register()
+    # The driver structs must outlive this call.
+    _refs.append((buf, draw_buf, disp_drv))
+    return disp
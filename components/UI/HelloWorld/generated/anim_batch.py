@@ -0,0 +1,158 @@
+'''
+Batched property animation for gui_guider.py.
+
+A BatchAnim drives several properties of one object (position, size, image
+zoom and angle) from a single lv.anim_t. The easing path is sampled once per
+frame into array tables when the animation is built, so each frame costs one
+Python callback that looks the values up, instead of one anim_*_cb call per
+property.
+
+Position and size are applied with set_pos and set_size, which only mark
+the layout dirty; LVGL moves and resizes the object, invalidating its old
+and new area, once when it updates the layout before the next refresh.
+Image zoom and angle are written to the lv_img_t together and the object is
+invalidated once, rather than by lv_img_set_zoom and lv_img_set_angle each
+invalidating the old and new transformed area.
+'''
+
+import lvgl as lv
+from uarray import array
+
+# Display refresh period of the board (CONFIG_LV_DISP_DEF_REFR_PERIOD).
+FRAME_MS = 30
+# Fixed-point scale of the sampled easing progress.
+SCALE = 1024
+
+X = 0
+Y = 1
+WIDTH = 2
+HEIGHT = 3
+IMG_ZOOM = 4
+IMG_ANGLE = 5
+
+# (path_cb, frames) -> array('h') of progress samples, shared by animations
+# with the same easing and length.
+_progress = {}
+
+
+def sample_path(path_cb, frames):
+    '''
+    Progress (0..SCALE) of path_cb at each of frames + 1 evenly spaced times.
+    Signed, so easings that under- or overshoot (back, anticipate) fit.
+    '''
+    key = (path_cb, frames)
+    table = _progress.get(key)
+    if table is None:
+        a = lv.anim_t()
+        a.init()
+        a.set_time(frames)
+        a.set_values(0, SCALE)
+        a.set_path_cb(path_cb)
+        table = array('h', [0] * (frames + 1))
+        for i in range(frames + 1):
+            a.act_time = i
+            table[i] = path_cb(a)
+        _progress[key] = table
+    return table
+
+
+class BatchAnim:
+
+    def __init__(self, obj, time, delay=0, path_cb=None, repeat=1, playback=False):
+        self.obj = obj
+        self.time = time
+        self.delay = delay
+        self.path_cb = path_cb or lv.anim_t.path_linear
+        self.repeat = repeat
+        self.playback = playback
+        self.frames = max(1, time // FRAME_MS)
+        self.tables = [None] * 6
+        self.frame = -1
+        self.calls = 0
+        self.anim = None
+        self.img = None
+        self.watching = False
+
+    def add(self, prop, start, end):
+        '''
+        Animate prop (X, Y, WIDTH, HEIGHT, IMG_ZOOM or IMG_ANGLE) from start
+        to end. Returns self so calls can be chained.
+        '''
+        progress = sample_path(self.path_cb, self.frames)
+        delta = end - start
+        table = array('i', [0] * (self.frames + 1))
+        for i in range(self.frames + 1):
+            table[i] = start + delta * progress[i] // SCALE
+        if prop == IMG_ZOOM or prop == IMG_ANGLE:
+            # Stored as lv_img_set_zoom / lv_img_set_angle would store them.
+            for i in range(self.frames + 1):
+                table[i] = max(table[i], 1) if prop == IMG_ZOOM else table[i] % 3600
+            if self.img is None:
+                self.img = lv.img_t.__cast__(self.obj)
+        self.tables[prop] = table
+        return self
+
+    def start(self):
+        a = lv.anim_t()
+        a.init()
+        # The animated value is the frame index; the easing is in the tables.
+        a.set_values(0, self.frames)
+        a.set_time(self.time)
+        a.set_delay(self.delay)
+        a.set_path_cb(lv.anim_t.path_linear)
+        a.set_repeat_count(self.repeat)
+        if self.playback:
+            a.set_playback_time(self.time)
+        # set_custom_exec_cb makes the anim its own var, so this animation is
+        # only deleted by stop(), not by lv.anim_del(obj, ...) or the
+        # deletion of obj; stop it when obj goes away.
+        a.set_custom_exec_cb(lambda a, frame: self.apply(frame))
+        a.set_ready_cb(lambda a: self._done())
+        if not self.watching:
+            self.obj.add_event_cb(lambda e: self.stop(), lv.EVENT.DELETE, None)
+            self.watching = True
+        self.stop()
+        self.frame = -1
+        self.anim = a.start()
+        return self
+
+    def _done(self):
+        # LVGL frees the anim once it has completed.
+        self.anim = None
+
+    def apply(self, frame):
+        self.calls += 1
+        if frame == self.frame:
+            return
+        self.frame = frame
+        obj = self.obj
+        x, y, w, h, zoom, angle = self.tables
+        if x is not None and y is not None:
+            obj.set_pos(x[frame], y[frame])
+        elif x is not None:
+            obj.set_x(x[frame])
+        elif y is not None:
+            obj.set_y(y[frame])
+        if w is not None and h is not None:
+            obj.set_size(w[frame], h[frame])
+        elif w is not None:
+            obj.set_width(w[frame])
+        elif h is not None:
+            obj.set_height(h[frame])
+        if zoom is not None or angle is not None:
+            img = self.img
+            # The old extent; refresh_ext_draw_size() invalidates the new
+            # one as well when the transformed size changes it.
+            obj.invalidate()
+            if zoom is not None:
+                img.zoom = zoom[frame]
+            if angle is not None:
+                img.angle = angle[frame]
+            obj.refresh_ext_draw_size()
+
+    def stop(self):
+        if self.anim is not None:
+            # The running anim is its own var, so this deletes exactly this
+            # animation, without reading it in case LVGL already freed it.
+            lv.anim_del(self.anim, None)
+            self.anim = None
@@ -0,0 +1,131 @@
+'''
+Read-only asset bundle: one blob holding every image and font, with an index
+mapping the original path (e.g. "MicroPython/lv_font_montserratMedium_16.fnt")
+to its offset, length, format and sha256. Entries are returned as memoryviews
+into the blob, so nothing is copied onto the heap.
+
+Layout (little endian):
+    header: magic "LVAB", u16 version, u16 entry count
+    entry:  u16 name length, name (utf-8), u32 offset, u32 length,
+            u8 format, 32-byte sha256 of the payload
+    data:   entry payloads, each starting on a 4-byte boundary
+
+Build the blob with tools/pack_assets.py.
+'''
+
+import ustruct as struct
+
+MAGIC = b'LVAB'
+VERSION = 2
+HEADER_FORMAT = '<4sHH'
+HEADER_SIZE = 8
+ENTRY_FORMAT = '<IIB32s'
+ENTRY_SIZE = 41
+
+# Entry formats
+FMT_RAW = 0
+FMT_LV_IMG = 1      # LVGL .bin image: lv_img_header_t + pixels
+FMT_PNG = 2
+FMT_LV_FONT = 3     # LVGL binary font (.fnt)
+FMT_LV_RLE = 4      # run-length encoded LVGL image (.rle, see rle_image.py)
+
+
+class AssetBundle:
+
+    def __init__(self, blob):
+        self.blob = memoryview(blob)
+        magic, version, count = struct.unpack_from(HEADER_FORMAT, self.blob, 0)
+        if bytes(magic) != MAGIC:
+            raise ValueError("not an asset bundle (magic %r)" % bytes(magic))
+        if version != VERSION:
+            raise ValueError("asset bundle version %d, expected %d" % (version, VERSION))
+        self.index = {}
+        pos = HEADER_SIZE
+        for _ in range(count):
+            name_len = struct.unpack_from('<H', self.blob, pos)[0]
+            pos += 2
+            name = str(bytes(self.blob[pos:pos + name_len]), 'utf-8')
+            pos += name_len
+            # name -> (offset, length, format, sha256)
+            self.index[name] = struct.unpack_from(ENTRY_FORMAT, self.blob, pos)
+            pos += ENTRY_SIZE
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def get(self, name):
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        return self.blob[entry[0]:entry[0] + entry[1]]
+
+    def format(self, name):
+        entry = self.index.get(name)
+        return None if entry is None else entry[2]
+
+    def verify(self, name):
+        import uhashlib as hashlib
+        entry = self.index.get(name)
+        return entry is not None and hashlib.sha256(self.get(name)).digest() == bytes(entry[3])
+
+
+def _mmap_file(path):
+    # The unix port has no mmap module, so call libc through ffi.
+    import ffi
+    import uctypes
+    import uos as os
+    libc = None
+    for name in ('libc.so.6', 'libc.so', 'libc.dylib'):
+        try:
+            libc = ffi.open(name)
+            break
+        except OSError:
+            pass
+    if libc is None:
+        raise OSError("libc not found")
+    c_open = libc.func('i', 'open', 'si')
+    c_close = libc.func('i', 'close', 'i')
+    c_mmap = libc.func('p', 'mmap', 'pLiiil')
+    size = os.stat(path)[6]
+    fd = c_open(path, 0)                        # O_RDONLY
+    if fd < 0:
+        raise OSError("open(%s) failed" % path)
+    addr = c_mmap(0, size, 1, 2, fd, 0)         # PROT_READ, MAP_PRIVATE
+    c_close(fd)
+    # Mappings are page aligned; MAP_FAILED is (void *)-1.
+    if addr == 0 or addr & 0xfff:
+        raise OSError("mmap(%s) failed" % path)
+    return uctypes.bytearray_at(addr, size)
+
+
+def open_bundle(path):
+    '''
+    Return the AssetBundle for path, or None when no bundle is available.
+
+    On target the blob is expected as BLOB in a frozen assets_rom module
+    (generated by tools/pack_assets.py --py), which keeps it in flash. On the
+    unix port the file is memory mapped. If neither works the file is read
+    into RAM as a last resort.
+    '''
+    try:
+        import assets_rom
+        return AssetBundle(assets_rom.BLOB)
+    except ImportError:
+        pass
+    except ValueError as e:
+        print(f'WARNING: frozen assets_rom ignored: {e}')
+    try:
+        blob = _mmap_file(path)
+    except (ImportError, OSError, AttributeError, TypeError):
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return None
+        print(f'WARNING: {path} could not be mapped, loaded into RAM')
+    try:
+        return AssetBundle(blob)
+    except ValueError as e:
+        # Stale or corrupt bundle: fall back to the loose asset files.
+        print(f'WARNING: {path} ignored: {e}')
+        return None
@@ -0,0 +1,92 @@
+'''
+Calendar popup for the date texts of gui_guider.py.
+'''
+
+import lvgl as lv
+
+# One DatePicker per screen with date texts, removed when the screen is deleted.
+pickers = {}
+
+
+class DatePicker:
+    '''
+    Calendar popup shared by every date text on one screen. It is built on
+    the top layer of the screen's display the first time one of them is
+    focused and afterwards only retargeted, shown and hidden, so focusing a
+    field does not rebuild the widget tree. It is deleted with the screen.
+    '''
+
+    def __init__(self, scr):
+        self.layer = lv.disp_get_layer_top(scr.get_disp())
+        self.target = None
+        self.text = None
+        self.date = lv.calendar_date_t()
+        self.highlighted = [lv.calendar_date_t()]
+        self.calendar = lv.calendar(self.layer)
+        lv.calendar_header_arrow(self.calendar)
+        self.hide()
+        scr.add_event_cb(lambda e: self.delete(scr), lv.EVENT.DELETE, None)
+
+    def show(self, target):
+        self.target = target
+        datestring = target.get_text()
+        if datestring != self.text:
+            self.text = datestring
+            fields = datestring.split('/')
+            date = self.highlighted[0]
+            date.year = int(fields[0])
+            date.month = int(fields[1])
+            date.day = int(fields[2])
+        date = self.highlighted[0]
+        calendar = self.calendar
+        calendar.set_showed_date(date.year, date.month)
+        calendar.set_highlighted_dates(self.highlighted, 1)
+        scr = target.get_screen()
+        calendar.set_size(int(scr.get_width() * 0.8), int(scr.get_height() * 0.8))
+        calendar.align(lv.ALIGN.CENTER, 0, 0)
+        calendar.clear_flag(lv.obj.FLAG.HIDDEN)
+        self.layer.add_flag(lv.obj.FLAG.CLICKABLE)
+
+    def hide(self):
+        self.target = None
+        self.calendar.add_flag(lv.obj.FLAG.HIDDEN)
+        self.layer.clear_flag(lv.obj.FLAG.CLICKABLE)
+        self.layer.set_style_bg_opa(lv.OPA.TRANSP, 0)
+
+    def pick(self):
+        '''
+        Write the pressed date into the target and hide the calendar.
+        Returns False when no date was pressed.
+        '''
+        if self.target is None:
+            return False
+        date = self.date
+        if self.calendar.get_pressed_date(date) != lv.RES.OK:
+            return False
+        self.text = "%d/%d/%d" % (date.year, date.month, date.day)
+        self.target.set_text(self.text)
+        self.highlighted[0].year = date.year
+        self.highlighted[0].month = date.month
+        self.highlighted[0].day = date.day
+        self.hide()
+        return True
+
+    def delete(self, scr):
+        # The top layer outlives the screen: release it only if this picker
+        # holds it, another screen's picker may be open during a transition.
+        pickers.pop(scr, None)
+        if self.target is not None:
+            self.hide()
+        self.calendar.delete()
+        self.calendar = None
+
+
+def get(scr, factory=DatePicker):
+    '''
+    The picker of scr, built with factory(scr) on first use.
+    '''
+    picker = pickers.get(scr)
+    if picker is None:
+        picker = factory(scr)
+        pickers[scr] = picker
+    return picker
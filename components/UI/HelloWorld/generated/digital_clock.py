@@ -0,0 +1,78 @@
+'''
+Allocation-free digital clock behind gui_guider.py's digital_clock_cb.
+'''
+
+
+class DigitalClock:
+    '''
+    Digital clock label updated once a second without allocating: the time is
+    kept packed in one int (pm << 24 | hour << 16 | minute << 8 | second) and
+    rendered into a preallocated, NUL-terminated bytearray that the label
+    shows through set_text_static. The label is only touched when the
+    displayed digits change.
+    '''
+
+    def __init__(self, obj, hour, minute, second, ampm, show_second, use_ampm):
+        self.obj = obj
+        self.show_second = show_second
+        self.use_ampm = use_ampm
+        # Only AM/PM roll over at 12; any other suffix is shown unchanged.
+        if ampm == 'AM' or ampm == 'PM':
+            self.ampm = ('AM', 'PM')
+        else:
+            self.ampm = (ampm, ampm)
+        self.suffixes = (str(self.ampm[0]).encode(), str(self.ampm[1]).encode())
+        pm = 1 if ampm == 'PM' else 0
+        self.state = (pm << 24) | (int(hour) << 16) | (int(minute) << 8) | int(second)
+        self.text = bytearray(11 + len(self.suffixes[0]))
+        self.shown = -1
+
+    def tick(self, timer=None):
+        state = self.state
+        hour = (state >> 16) & 0xff
+        minute = (state >> 8) & 0xff
+        second = (state & 0xff) + 1
+        pm = state >> 24
+        if second == 60:
+            second = 0
+            minute = minute + 1
+            if minute == 60:
+                minute = 0
+                hour = hour + 1
+                if self.use_ampm:
+                    if hour == 12:
+                        pm ^= 1
+                    if hour > 12:
+                        hour = hour % 12
+        hour = hour % 24
+        state = (pm << 24) | (hour << 16) | (minute << 8) | second
+        self.state = state
+        shown = state if self.show_second else state >> 8
+        if shown != self.shown:
+            self.shown = shown
+            self.render(hour, minute, second, pm)
+
+    def render(self, hour, minute, second, pm):
+        text = self.text
+        i = 0
+        if hour >= 10:
+            text[0] = 48 + hour // 10
+            i = 1
+        text[i] = 48 + hour % 10
+        text[i + 1] = 58
+        text[i + 2] = 48 + minute // 10
+        text[i + 3] = 48 + minute % 10
+        i += 4
+        if self.show_second:
+            text[i] = 58
+            text[i + 1] = 48 + second // 10
+            text[i + 2] = 48 + second % 10
+            i += 3
+        if self.use_ampm:
+            text[i] = 32
+            i += 1
+            for c in self.suffixes[pm]:
+                text[i] = c
+                i += 1
+        text[i] = 0
+        self.obj.set_text_static(text)
@@ -0,0 +1,87 @@
+'''
+Flush accounting for the display driver: wraps a flush_cb and records each
+flushed area, the bytes pushed and the time spent in the flush, plus an
+estimate of the SPI transfer time on the board (main.c drives the panel at
+EXAMPLE_LCD_PIXEL_CLK_HZ, 40 MHz).
+'''
+
+import utime as time
+
+SPI_HZ = 40 * 1000 * 1000
+
+
+class FlushMonitor:
+
+    def __init__(self, flush_cb, color_size, spi_hz=SPI_HZ, history=64):
+        self.flush_cb = flush_cb
+        self.color_size = color_size
+        self.spi_hz = spi_hz
+        # Ring of the most recent areas: [x1, y1, x2, y2, flush_us]
+        self.history = [[0, 0, 0, 0, 0] for _ in range(history)]
+        self.reset()
+
+    def reset(self):
+        self.flushes = 0
+        self.pixels = 0
+        self.bytes = 0
+        self.flush_us = 0
+        self.max_flush_us = 0
+        self.max_area = 0
+        self._next = 0
+
+    def flush(self, disp_drv, area, color_p):
+        t0 = time.ticks_us()
+        self.flush_cb(disp_drv, area, color_p)
+        dt = time.ticks_diff(time.ticks_us(), t0)
+        x1 = area.x1
+        y1 = area.y1
+        x2 = area.x2
+        y2 = area.y2
+        pixels = (x2 - x1 + 1) * (y2 - y1 + 1)
+        self.flushes += 1
+        self.pixels += pixels
+        self.bytes += pixels * self.color_size
+        self.flush_us += dt
+        if dt > self.max_flush_us:
+            self.max_flush_us = dt
+        if pixels > self.max_area:
+            self.max_area = pixels
+        entry = self.history[self._next % len(self.history)]
+        entry[0] = x1
+        entry[1] = y1
+        entry[2] = x2
+        entry[3] = y2
+        entry[4] = dt
+        self._next += 1
+
+    def areas(self):
+        '''
+        Most recent flushed areas, oldest first.
+        '''
+        n = len(self.history)
+        count = min(self._next, n)
+        return [tuple(self.history[i % n]) for i in range(self._next - count, self._next)]
+
+    def stats(self):
+        return {
+            'flushes': self.flushes,
+            'pixels': self.pixels,
+            'bytes': self.bytes,
+            'flush_us': self.flush_us,
+            'max_flush_us': self.max_flush_us,
+            'max_area': self.max_area,
+            'spi_us': self.bytes * 8 * 1000000 // self.spi_hz,
+        }
+
+    def snapshot(self, label=''):
+        '''
+        Print and return the stats gathered since the last reset, then reset.
+        Bracket a screen transition with reset() / snapshot() to see how much
+        it invalidates.
+        '''
+        stats = self.stats()
+        print('%s: %d flushes, %d px, %d bytes, flush %d us (max %d), est. SPI %d us' % (
+            label, stats['flushes'], stats['pixels'], stats['bytes'],
+            stats['flush_us'], stats['max_flush_us'], stats['spi_us']))
+        self.reset()
+        return stats
@@ -5,6 +5,60 @@ Original author: mhepp(https://forum.lvgl.io/u/mhepp/summary)
 import lvgl as lv
 import ustruct as struct
 
+# Read cache: each file opened for reading gets a block buffer that is refilled
+# with one readinto() of block_size * read_ahead bytes. Buffers are pooled and
+# handed to the next open file on close, so steady-state reads do not allocate.
+_block_size = 0
+_block_pool = []
+
+# Write-back buffer: writes smaller than _write_size are collected per file and
+# reach the file in one write() when the buffer is full and on seek, read,
+# close or sync(). Buffers are pooled like the read blocks.
+_write_size = 0
+_write_pool = []
+_open_files = []
+_write_stats = {'calls': 0, 'bytes': 0, 'writes': 0, 'written': 0}
+
+
+def _write_u32(ptr, value):
+    struct.pack_into("<L", ptr.__dereference__(4), 0, value)
+
+
+def _physical_write(fs, data):
+    # Write all of data, continuing after short writes. The OS position is
+    # unknown until it succeeds, so a failed write is retried after a seek.
+    f = fs['file']
+    fs['fpos'] = -1
+    n = 0
+    while n < len(data):
+        k = f.write(data[n:] if n else data)
+        _write_stats['writes'] += 1
+        if not k:
+            raise OSError("short write (%d of %d bytes)" % (n, len(data)))
+        n += k
+        _write_stats['written'] += k
+    return n
+
+
+def _flush(fs):
+    # Write out the buffered bytes at the position they were written to. On
+    # error they stay buffered for the next flush.
+    wlen = fs['wlen']
+    if wlen:
+        if fs['fpos'] != fs['wstart']:
+            fs['file'].seek(fs['wstart'])
+        _physical_write(fs, fs['wview'][0:wlen])
+        fs['fpos'] = fs['wstart'] + wlen
+        fs['wlen'] = 0
+
+
+def _sync_pos(fs):
+    # Read-ahead moves the OS file position past the logical position.
+    if fs['fpos'] != fs['pos']:
+        fs['file'].seek(fs['pos'])
+        fs['fpos'] = fs['pos']
+
+
 def fs_open_cb(drv, path, mode):
 
     if mode == lv.FS_MODE.WR:
@@ -22,59 +76,172 @@ def fs_open_cb(drv, path, mode):
     except OSError as e:
         raise RuntimeError("fs_open_callback(%s) exception: %s" % (path, e))
 
-    return {'file' : f, 'path': path}
+    block = None
+    if _block_size and mode & lv.FS_MODE.RD:
+        block = _block_pool.pop() if _block_pool else bytearray(_block_size)
+    wbuf = None
+    if _write_size and mode & lv.FS_MODE.WR:
+        wbuf = _write_pool.pop() if _write_pool else bytearray(_write_size)
+
+    fs = {'file' : f, 'path': path, 'pos': 0, 'fpos': 0,
+          'block': block, 'block_start': 0, 'block_len': 0,
+          'wbuf': wbuf, 'wview': memoryview(wbuf) if wbuf else None,
+          'wstart': 0, 'wlen': 0}
+    if wbuf is not None:
+        _open_files.append(fs)
+    return fs
 
 
 def fs_close_cb(drv, fs_file):
+    fs = fs_file.__cast__()
     try:
-        fs_file.__cast__()['file'].close()
+        try:
+            _flush(fs)
+        finally:
+            fs['file'].close()
     except OSError as e:
-        raise RuntimeError("fs_close_callback(%s) exception: %s" % (fs_file.__cast__()['path'], e))
+        raise RuntimeError("fs_close_callback(%s) exception: %s" % (fs['path'], e))
+    finally:
+        block = fs['block']
+        if block is not None and len(block) == _block_size:
+            _block_pool.append(block)
+        fs['block'] = None
+        wbuf = fs['wbuf']
+        if wbuf is not None:
+            _open_files.remove(fs)
+            if len(wbuf) == _write_size:
+                _write_pool.append(wbuf)
+        fs['wbuf'] = fs['wview'] = None
 
     return lv.FS_RES.OK
 
 
 def fs_read_cb(drv, fs_file, buf, btr, br):
+    fs = fs_file.__cast__()
     try:
-        tmp_data = fs_file.__cast__()['file'].read(btr)
-        buf.__dereference__(btr)[0:len(tmp_data)] = tmp_data
-        br.__dereference__(4)[0:4] = struct.pack("<L", len(tmp_data))
+        _flush(fs)
+        dst = buf.__dereference__(btr)
+        block = fs['block']
+        n = 0
+        # Requests crossing the end of the cached block continue from the
+        # file, so only a real end of file gives a short read.
+        while n < btr:
+            pos = fs['pos']
+            off = pos - fs['block_start']
+            if block is not None and 0 <= off < fs['block_len']:
+                # Served from the cached block.
+                k = min(btr - n, fs['block_len'] - off)
+                dst[n:n + k] = memoryview(block)[off:off + k]
+            elif block is None or btr - n >= len(block):
+                # Large reads bypass the cache and land directly in LVGL's buffer.
+                _sync_pos(fs)
+                k = fs['file'].readinto(dst[n:] if n else dst) or 0
+                fs['fpos'] += k
+            else:
+                _sync_pos(fs)
+                filled = fs['file'].readinto(block) or 0
+                fs['fpos'] += filled
+                fs['block_start'] = pos
+                fs['block_len'] = filled
+                k = min(btr - n, filled)
+                dst[n:n + k] = memoryview(block)[0:k]
+            if not k:
+                break
+            n += k
+            fs['pos'] = pos + k
+        # The font loader passes no br.
+        if br is not None:
+            _write_u32(br, n)
     except OSError as e:
-        raise RuntimeError("fs_read_callback(%s) exception %s" % (fs_file.__cast__()['path'], e))
+        raise RuntimeError("fs_read_callback(%s) exception %s" % (fs['path'], e))
 
     return lv.FS_RES.OK
 
 
 def fs_seek_cb(drv, fs_file, pos, whence):
+    fs = fs_file.__cast__()
     try:
-        fs_file.__cast__()['file'].seek(pos, whence)
+        _flush(fs)
+        if whence == lv.FS_SEEK.SET:
+            fs['pos'] = pos
+        elif whence == lv.FS_SEEK.CUR:
+            fs['pos'] += pos
+        else:
+            fs['fpos'] = fs['pos'] = fs['file'].seek(pos, whence)
     except OSError as e:
-        raise RuntimeError("fs_seek_callback(%s) exception %s" % (fs_file.__cast__()['path'], e))
+        raise RuntimeError("fs_seek_callback(%s) exception %s" % (fs['path'], e))
 
     return lv.FS_RES.OK
 
 
 def fs_tell_cb(drv, fs_file, pos):
-    try:
-        tpos = fs_file.__cast__()['file'].tell()
-        pos.__dereference__(4)[0:4] = struct.pack("<L", tpos)
-    except OSError as e:
-        raise RuntimeError("fs_tell_callback(%s) exception %s" % (fs_file.__cast__()['path'], e))
+    fs = fs_file.__cast__()
+    _write_u32(pos, fs['pos'])
 
     return lv.FS_RES.OK
 
 
 def fs_write_cb(drv, fs_file, buf, btw, bw):
+    fs = fs_file.__cast__()
     try:
-        wr = fs_file.__cast__()['file'].write(buf.__dereference__(btw)[0:btw])
-        bw.__dereference__(4)[0:4] = struct.pack("<L", wr)
+        data = buf.__dereference__(btw)
+        wbuf = fs['wbuf']
+        if wbuf is None or btw >= len(wbuf):
+            # Large writes go straight from LVGL's buffer to the file.
+            _flush(fs)
+            _sync_pos(fs)
+            wr = _physical_write(fs, data)
+            fs['fpos'] = fs['pos'] + wr
+        else:
+            wlen = fs['wlen']
+            if wlen and wlen + btw > len(wbuf):
+                _flush(fs)
+                wlen = 0
+            if not wlen:
+                fs['wstart'] = fs['pos']
+            fs['wview'][wlen:wlen + btw] = data
+            fs['wlen'] = wlen + btw
+            wr = btw
+        fs['pos'] += wr
+        fs['block_len'] = 0
+        _write_stats['calls'] += 1
+        _write_stats['bytes'] += wr
+        _write_u32(bw, wr)
     except OSError as e:
-        raise RuntimeError("fs_write_callback(%s) exception %s" % (fs_file.__cast__()['path'], e))
+        raise RuntimeError("fs_write_callback(%s) exception %s" % (fs['path'], e))
 
     return lv.FS_RES.OK
 
 
-def fs_register(fs_drv, letter, cache_size=500):
+def sync():
+    '''
+    Write the buffered data of every open file to the file system.
+    '''
+    for fs in _open_files:
+        try:
+            _flush(fs)
+            fs['file'].flush()
+        except OSError as e:
+            raise RuntimeError("fs_sync(%s) exception %s" % (fs['path'], e))
+
+
+def write_stats():
+    '''
+    LVGL write calls and bytes against the physical write() calls they
+    turned into and the bytes those wrote.
+    '''
+    return dict(_write_stats)
+
+
+def fs_register(fs_drv, letter, cache_size=500, block_size=None, read_ahead=2,
+                write_size=512):
+    '''
+    cache_size is handed to LVGL's own lv_fs read cache. The Python side reads
+    block_size * read_ahead bytes per refill; block_size defaults to
+    cache_size. A negative cache_size leaves both caches disabled. write_size
+    is the write-back buffer of each file opened for writing, 0 disables it.
+    '''
+    global _block_size, _write_size
 
     fs_drv.init()
     fs_drv.letter = ord(letter)
@@ -87,6 +254,72 @@ def fs_register(fs_drv, letter, cache_size=500):
 
     if cache_size >= 0:
         fs_drv.cache_size = cache_size
+        if block_size is None:
+            block_size = cache_size
+        _block_size = max(block_size, 0) * max(read_ahead, 1)
+    _write_size = max(write_size, 0)
 
     fs_drv.register()
 
+
+# Read-only drive serving entries of an asset_bundle.AssetBundle. Reads are
+# copies out of the mapped blob, no file is opened. The binding keeps its
+# callbacks in fs_drv.user_data, so bundles are looked up by drive letter.
+_bundles = {}
+
+
+def _bundle_open_cb(drv, path, mode):
+    if mode != lv.FS_MODE.RD:
+        raise RuntimeError("bundle_open_callback(%s) - drive is read-only" % path)
+    data = _bundles[drv.letter].get(path)
+    if data is None:
+        raise RuntimeError("bundle_open_callback(%s) - no such asset" % path)
+    return {'data': data, 'path': path, 'pos': 0}
+
+
+def _bundle_close_cb(drv, fs_file):
+    fs_file.__cast__()['data'] = None
+    return lv.FS_RES.OK
+
+
+def _bundle_read_cb(drv, fs_file, buf, btr, br):
+    fs = fs_file.__cast__()
+    data = fs['data']
+    pos = fs['pos']
+    n = max(min(btr, len(data) - pos), 0)
+    buf.__dereference__(btr)[0:n] = data[pos:pos + n]
+    fs['pos'] = pos + n
+    if br is not None:
+        _write_u32(br, n)
+    return lv.FS_RES.OK
+
+
+def _bundle_seek_cb(drv, fs_file, pos, whence):
+    fs = fs_file.__cast__()
+    if whence == lv.FS_SEEK.SET:
+        fs['pos'] = pos
+    elif whence == lv.FS_SEEK.CUR:
+        fs['pos'] += pos
+    else:
+        fs['pos'] = len(fs['data']) + pos
+    return lv.FS_RES.OK
+
+
+def _bundle_tell_cb(drv, fs_file, pos):
+    _write_u32(pos, fs_file.__cast__()['pos'])
+    return lv.FS_RES.OK
+
+
+def fs_register_bundle(fs_drv, letter, bundle):
+
+    fs_drv.init()
+    fs_drv.letter = ord(letter)
+    fs_drv.open_cb = _bundle_open_cb
+    fs_drv.read_cb = _bundle_read_cb
+    fs_drv.seek_cb = _bundle_seek_cb
+    fs_drv.tell_cb = _bundle_tell_cb
+    fs_drv.close_cb = _bundle_close_cb
+    fs_drv.cache_size = 0
+    _bundles[ord(letter)] = bundle
+
+    fs_drv.register()
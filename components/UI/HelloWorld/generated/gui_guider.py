@@ -5,43 +5,133 @@
 # comply with and are bound by, such license terms.  If you do not agree to be bound by the applicable license
 # terms, then you may not retain, install, activate or otherwise use the software.
 
-import SDL
 import utime as time
+import uos
 import usys as sys
 import lvgl as lv
 import lodepng as png
 import ustruct
+import uctypes
 import fs_driver
+import asset_bundle
+import screen_manager
+import lv_loop
+import imagetools
+import lru_cache
+import png_stream
+import anim_batch
+import digital_clock
+import date_picker
+import rle_image
 
 lv.init()
-SDL.init(w=240,h=280)
-
-# Register SDL display driver.
-disp_buf1 = lv.disp_draw_buf_t()
-buf1_1 = bytearray(240*280*4)
-disp_buf1.init(buf1_1, None, len(buf1_1)//4)
-disp_drv = lv.disp_drv_t()
-disp_drv.init()
-disp_drv.draw_buf = disp_buf1
-disp_drv.flush_cb = SDL.monitor_flush
-disp_drv.hor_res = 240
-disp_drv.ver_res = 280
-disp_drv.register()
-
-# Regsiter SDL mouse driver
-indev_drv = lv.indev_drv_t()
-indev_drv.init()
-indev_drv.type = lv.INDEV_TYPE.POINTER
-indev_drv.read_cb = SDL.mouse_read
-indev_drv.register()
+
+COLOR_SIZE = lv.color_t.__SIZE__
+COLOR_IS_SWAPPED = hasattr(lv.color_t().ch,'green_h')
+
+# Display configuration.
+# The draw buffer follows the binding's LV_COLOR_DEPTH. The stock unix port
+# is 32-bit; tools/build_simulator.py builds one with the board's
+# CONFIG_LV_COLOR_DEPTH_16 for matching memory and bandwidth.
+# DRAW_BUF_LINES / DRAW_BUF_DOUBLE mirror EXAMPLE_LCD_DRAW_BUFF_HEIGHT and
+# EXAMPLE_LCD_DRAW_BUFF_DOUBLE in main.c; use 280 lines for a full frame.
+# With FLUSH_STATS every flush is recorded by flush_monitor.FlushMonitor.
+DRAW_BUF_LINES = 50
+DRAW_BUF_DOUBLE = True
+FLUSH_STATS = False
+# PROFILE: time refreshes, flushes, input reads and Python callbacks, show an
+# FPS/CPU overlay; dump the trace with prof.dump('trace.json').
+PROFILE = False
+# The instrumentation modules are only imported, and compiled, when enabled.
+prof = None
+if PROFILE:
+    import profiler
+    prof = profiler.Profiler()
+flush_stats = None
+
+def traced(fn):
+    return prof.wrap(fn) if prof is not None else fn
+
+# Python event handlers bump event_stats.count; the display monitor_cb, called
+# after every refresh, closes the frame so dispatches can be read per frame.
+class EventStats:
+    def __init__(self):
+        self.count = 0
+        self.frames = 0
+        self.total = 0
+        self.last = 0
+        self.peak = 0
+
+    def frame(self):
+        self.last = self.count
+        self.total += self.count
+        if self.count > self.peak:
+            self.peak = self.count
+        self.frames += 1
+        self.count = 0
+
+    def per_frame(self):
+        return self.total / self.frames if self.frames else 0
+
+event_stats = EventStats()
+
+def disp_monitor_cb(drv, time_ms, px):
+    event_stats.frame()
+    if prof is not None:
+        prof.monitor(drv, time_ms, px)
+
+def snapshot_flush_stats(old, new):
+    if old is not None:
+        flush_stats.snapshot(f'{old} (then -> {new})')
+
+def init_display(flush_cb, read_cb=None):
+    '''
+    Register the 240x280 display with flush_cb and, when given, a pointer
+    input device with read_cb. The simulator passes the SDL driver; the
+    benchmarks pass headless stand-ins.
+    '''
+    global disp_buf1, buf1_1, buf1_2, disp_drv, indev_drv, flush_stats
+    disp_buf1 = lv.disp_draw_buf_t()
+    buf1_1 = bytearray(240*DRAW_BUF_LINES*COLOR_SIZE)
+    buf1_2 = bytearray(240*DRAW_BUF_LINES*COLOR_SIZE) if DRAW_BUF_DOUBLE else None
+    disp_buf1.init(buf1_1, buf1_2, len(buf1_1)//COLOR_SIZE)
+    disp_drv = lv.disp_drv_t()
+    disp_drv.init()
+    disp_drv.draw_buf = disp_buf1
+    if FLUSH_STATS:
+        import flush_monitor
+        flush_stats = flush_monitor.FlushMonitor(flush_cb, COLOR_SIZE)
+        flush_cb = flush_stats.flush
+        # Each report covers the transition into the screen being left and
+        # everything redrawn while it was active.
+        ui.on_load = snapshot_flush_stats
+    if prof is not None:
+        flush_cb = prof.wrap_flush(flush_cb)
+    disp_drv.flush_cb = flush_cb
+    disp_drv.hor_res = 240
+    disp_drv.ver_res = 280
+    disp_drv.monitor_cb = disp_monitor_cb
+    disp = disp_drv.register()
+
+    if read_cb is not None:
+        indev_drv = lv.indev_drv_t()
+        indev_drv.init()
+        indev_drv.type = lv.INDEV_TYPE.POINTER
+        indev_drv.read_cb = read_cb if prof is None else prof.wrap_read(read_cb)
+        indev_drv.register()
+    return disp
 
 fs_drv = lv.fs_drv_t()
 fs_driver.fs_register(fs_drv, 'Z')
 
-# Below: Taken from https://github.com/lvgl/lv_binding_micropython/blob/master/driver/js/imagetools.py#L22-L94
+# Read-only asset bundle (tools/pack_assets.py), memory mapped on the unix port
+# and frozen into flash on target. Served as drive 'R' and used by load_image.
+assets = asset_bundle.open_bundle('MicroPython/assets.bundle')
+if assets is not None:
+    rom_drv = lv.fs_drv_t()
+    fs_driver.fs_register_bundle(rom_drv, 'R', assets)
 
-COLOR_SIZE = lv.color_t.__SIZE__
-COLOR_IS_SWAPPED = hasattr(lv.color_t().ch,'green_h')
+# Below: Taken from https://github.com/lvgl/lv_binding_micropython/blob/master/driver/js/imagetools.py#L22-L94
 
 class lodepng_error(RuntimeError):
     def __init__(self, err):
@@ -53,49 +143,183 @@ class lodepng_error(RuntimeError):
 # Parse PNG file header
 # Taken from https://github.com/shibukawa/imagesize_py/blob/ffef30c1a4715c5acf90e8945ceb77f4a2ed2d45/imagesize.py#L63-L85
 
-def get_png_info(decoder, src, header):
-    # Only handle variable image types
+def parse_image_header(head, is_bin):
+    # (w, h, cf, format) from the first bytes of a PNG, RLE or LVGL .bin
+    # image, format being one of the asset_bundle.FMT_* image codes.
+    if head.startswith(b'\211PNG\r\n\032\n'):
+        if head[12:16] == b'IHDR':
+            start = 16
+        # Maybe this is for an older PNG version.
+        else:
+            start = 8
+        try:
+            width, height = ustruct.unpack(">LL", head[start:start+8])
+        except (ustruct.error, ValueError):
+            return None
+        return (width, height, lv.img.CF.TRUE_COLOR_ALPHA, asset_bundle.FMT_PNG)
+    rle = rle_image.read_header(head)
+    if rle is not None:
+        return (rle[2], rle[3], rle[0], asset_bundle.FMT_LV_RLE)
+    if is_bin and len(head) >= 4:
+        cf, width, height = bin_image_header(head)
+        return (width, height, cf, asset_bundle.FMT_LV_IMG)
+    return None
 
-    if lv.img.src_get_type(src) != lv.img.SRC.VARIABLE:
-        return lv.RES.INV
+def src_path(src):
+    # File sources are NUL-terminated paths owned by the image widget. The
+    # view is widened until it reaches the NUL, so no length is assumed.
+    addr = uctypes.addressof(src.__dereference__(1))
+    view = uctypes.bytearray_at(addr, 64)
+    n = 0
+    while True:
+        if n == len(view):
+            view = uctypes.bytearray_at(addr, 2 * n)
+        if not view[n]:
+            break
+        n += 1
+    return bytes(view[:n]).decode()
+
+def read_asset(path, size=-1):
+    # Whole file (size -1) or its first size bytes, for drives 'Z' and 'R'.
+    drive, name = path[0], path[2:]
+    if drive == 'R' and assets is not None:
+        data = assets.get(name)
+        if data is not None and size >= 0:
+            data = bytes(data[:size])
+        return data
+    if drive == 'Z':
+        try:
+            with open(name, 'rb') as f:
+                return f.read(size)
+        except OSError:
+            return None
+    return None
+
+# Header-only image info for file sources: path -> (w, h, cf, format), read
+# once from the first bytes of the file. Setting a path source and laying
+# out its widget then never reads or decodes the pixel data.
+
+image_index = {}
+
+def file_image_info(path):
+    info = image_index.get(path)
+    if info is None:
+        head = read_asset(path, 33)
+        info = None if head is None else parse_image_header(head, path.endswith('.bin'))
+        # Misses are not remembered: the file may be written later.
+        if info is not None:
+            image_index[path] = info
+    return info
 
+def variable_image_info(src):
+    # Only PNG and RLE data are handled here; .bin descriptors carry their header.
     data = lv.img_dsc_t.__cast__(src).data
     if data == None:
-        return lv.RES.INV
+        return None
+    return parse_image_header(bytes(data.__dereference__(24)), False)
 
-    png_header = bytes(data.__dereference__(24))
+def image_info(src):
+    src_type = lv.img.src_get_type(src)
+    if src_type == lv.img.SRC.FILE:
+        return file_image_info(src_path(src))
+    if src_type == lv.img.SRC.VARIABLE:
+        return variable_image_info(src)
+    return None
 
-    if png_header.startswith(b'\211PNG\r\n\032\n'):
-        if png_header[12:16] == b'IHDR':
-            start = 16
-        # Maybe this is for an older PNG version.
-        else:
-            start = 8
-        try:
-            width, height = ustruct.unpack(">LL", png_header[start:start+8])
-        except ustruct.error:
-            return lv.RES.INV
-    else:
+def get_image_info(decoder, src, header):
+    info = image_info(src)
+    if info is None:
         return lv.RES.INV
 
     header.always_zero = 0
-    header.w = width
-    header.h = height
-    header.cf = lv.img.CF.TRUE_COLOR_ALPHA
+    header.w = info[0]
+    header.h = info[1]
+    header.cf = info[2]
 
     return lv.RES.OK
 
 def convert_rgba8888_to_bgra8888(img_view):
-    for i in range(0, len(img_view), lv.color_t.__SIZE__):
-        ch = lv.color_t.__cast__(img_view[i:i]).ch
-        ch.red, ch.blue = ch.blue, ch.red
+    imagetools.swap_red_blue(img_view)
+
+# Decoded PNGs are kept in a byte-budgeted LRU cache so switching back to a
+# screen does not run png.decode32 again (CONFIG_LV_IMG_CACHE_DEF_SIZE=0).
+
+PNG_CACHE_SIZE = 256 * 1024
+
+def free_png(key, img_data):
+    lv.mem_free(img_data)
+
+png_cache = lru_cache.LRUCache(PNG_CACHE_SIZE, free_png)
+
+# PNGs whose decoded pixels would not fit in png_cache are decoded through
+# read_line in bands of PNG_STREAM_LINES rows instead of into one buffer
+# (0 disables streaming). Stream state is kept across open/close so partial
+# refreshes continue where the last strip stopped.
+
+PNG_STREAM_LINES = 16
+PNG_STREAM_CACHE_SIZE = 128 * 1024
+
+# Cached streams by id(); an open descriptor's user_data points at its
+# stream, so read_line_png finds it without resolving dsc.src per row.
+png_stream_ids = {}
+
+def forget_png_stream(key, stream):
+    png_stream_ids.pop(id(stream), None)
+
+png_streams = lru_cache.LRUCache(PNG_STREAM_CACHE_SIZE, forget_png_stream)
+# Large PNGs that PngStream cannot decode; they go through png_cache.
+png_unstreamable = set()
+
+def image_src_key(src):
+    if lv.img.src_get_type(src) == lv.img.SRC.FILE:
+        return src_path(src)
+    # Variable sources point into the asset bundle, which lives as long as
+    # the process, so address and size identify the image.
+    img_dsc = lv.img_dsc_t.__cast__(src)
+    return (uctypes.addressof(img_dsc.data.__dereference__(1)), img_dsc.data_size)
 
 # Read and parse PNG file
 
 def open_png(decoder, dsc):
-    img_dsc = lv.img_dsc_t.__cast__(dsc.src)
-    png_data = img_dsc.data
-    png_size = img_dsc.data_size
+    info = image_info(dsc.src)
+    if info is None or info[3] != asset_bundle.FMT_PNG:
+        # .bin files go to LVGL's built-in decoder, which reads their
+        # lines straight from the file.
+        return lv.RES.INV
+    key = image_src_key(dsc.src)
+    is_file = type(key) is str
+    # Streamed images never enter png_cache, so only one of the two caches
+    # is asked, and a cached stream is reused before any file is read.
+    streamed = png_streamable(key, dsc)
+    if streamed:
+        stream = png_streams.get(key)
+        if stream is not None:
+            png_streams.pin(key)
+            attach_png_stream(dsc, stream)
+            return lv.RES.OK
+    else:
+        img_data = png_cache.get(key)
+        if img_data is not None:
+            png_cache.pin(key)
+            dsc.img_data = img_data
+            return lv.RES.OK
+
+    if is_file:
+        # Path sources are only read once the image is drawn.
+        png_data = read_asset(key)
+        if png_data is None:
+            return lv.RES.INV
+        png_size = len(png_data)
+        png_buf = png_data
+    else:
+        img_dsc = lv.img_dsc_t.__cast__(dsc.src)
+        png_data = img_dsc.data
+        png_size = img_dsc.data_size
+        png_buf = png_data.__dereference__(png_size)
+
+    if streamed and open_png_stream(key, dsc, png_buf):
+        return lv.RES.OK
+
     png_decoded = png.C_Pointer()
     png_width = png.C_Pointer()
     png_height = png.C_Pointer()
@@ -108,17 +332,131 @@ def open_png(decoder, dsc):
 
     if COLOR_SIZE == 4:
         convert_rgba8888_to_bgra8888(img_view)
+    elif COLOR_SIZE == 2:
+        # RGB565 + alpha, 3 bytes per pixel: give the unused quarter back.
+        imagetools.rgba8888_to_rgb565a8(img_view, COLOR_IS_SWAPPED)
+        img_size = img_size * 3 // 4
+        img_data = lv.mem_realloc(img_data, img_size)
     else:
+        lv.mem_free(img_data)
         raise lodepng_error("Error: Color mode not supported yet!")
 
+    png_cache.put(key, img_data, img_size, True)
     dsc.img_data = img_data
     return lv.RES.OK
 
+def png_streamable(key, dsc):
+    # Whether the decoded pixels would not fit in png_cache.
+    if not PNG_STREAM_LINES or COLOR_SIZE not in (2, 4) or key in png_unstreamable:
+        return False
+    px = 3 if COLOR_SIZE == 2 else 4
+    return dsc.header.w * dsc.header.h * px > PNG_CACHE_SIZE
+
+def open_png_stream(key, dsc, png_buf):
+    try:
+        stream = png_stream.PngStream(png_buf, COLOR_SIZE, COLOR_IS_SWAPPED, PNG_STREAM_LINES)
+    except ValueError:
+        # Palette, grey, 16-bit or interlaced: decode the whole image, now
+        # and on later opens.
+        png_unstreamable.add(key)
+        return False
+    png_streams.put(key, stream, stream.size, True)
+    png_stream_ids[id(stream)] = stream
+    attach_png_stream(dsc, stream)
+    return True
+
+def attach_png_stream(dsc, stream):
+    # No img_data: LVGL fetches the pixels row by row through read_line_png.
+    dsc.img_data = None
+    dsc.user_data = stream
+
+def read_line_png(decoder, dsc, x, y, length, buf):
+    if dsc.user_data is None:
+        return lv.RES.INV
+    stream = png_stream_ids.get(uctypes.addressof(dsc.user_data.__dereference__(1)))
+    if stream is None:
+        return lv.RES.INV
+    stream.read_line(x, y, length, buf.__dereference__(length * stream.px))
+    return lv.RES.OK
+
+def close_png(decoder, dsc):
+    key = image_src_key(dsc.src)
+    png_cache.unpin(key)
+    if dsc.user_data is not None:
+        png_streams.unpin(key)
+        dsc.user_data = None
+    dsc.img_data = None
+
 # Above: Taken from https://github.com/lvgl/lv_binding_micropython/blob/master/driver/js/imagetools.py#L22-L94
 
 decoder = lv.img.decoder_create()
-decoder.info_cb = get_png_info
+decoder.info_cb = get_image_info
 decoder.open_cb = open_png
+decoder.read_line_cb = read_line_png
+decoder.close_cb = close_png
+
+# Run-length encoded images (tools/compress_images.py) are expanded a line at
+# a time through read_line; only the compressed data and one line are held.
+
+RLE_CACHE_SIZE = 64 * 1024
+
+rle_images = lru_cache.LRUCache(RLE_CACHE_SIZE)
+# Sources already reported as written for another color depth.
+rle_mismatched = set()
+
+# Bytes per pixel LVGL expects for each true color format.
+TRUE_COLOR_PX_SIZE = {
+    lv.img.CF.TRUE_COLOR: COLOR_SIZE,
+    lv.img.CF.TRUE_COLOR_CHROMA_KEYED: COLOR_SIZE,
+    lv.img.CF.TRUE_COLOR_ALPHA: COLOR_SIZE + 1 if COLOR_SIZE < 4 else 4,
+}
+
+def open_rle(decoder, dsc):
+    info = image_info(dsc.src)
+    if info is None or info[3] != asset_bundle.FMT_LV_RLE:
+        return lv.RES.INV
+    key = image_src_key(dsc.src)
+    img = rle_images.get(key)
+    if img is None:
+        if type(key) is str:
+            data = read_asset(key)
+            if data is None:
+                return lv.RES.INV
+        else:
+            img_dsc = lv.img_dsc_t.__cast__(dsc.src)
+            data = img_dsc.data.__dereference__(img_dsc.data_size)
+        img = rle_image.RleImage(data)
+        if TRUE_COLOR_PX_SIZE.get(img.cf) != img.px:
+            # load_image skips these; a source set directly draws nothing.
+            if key not in rle_mismatched:
+                rle_mismatched.add(key)
+                print(f'WARNING: {key} has {img.px} bytes per pixel, not for LV_COLOR_DEPTH {COLOR_SIZE * 8}')
+            return lv.RES.INV
+        rle_images.put(key, img, img.size, True)
+    else:
+        rle_images.pin(key)
+    dsc.img_data = None
+    return lv.RES.OK
+
+def read_line_rle(decoder, dsc, x, y, length, buf):
+    img = rle_images.get(image_src_key(dsc.src))
+    if img is None:
+        return lv.RES.INV
+    img.read_line(x, y, length, buf.__dereference__(length * img.px))
+    return lv.RES.OK
+
+def close_rle(decoder, dsc):
+    rle_images.unpin(image_src_key(dsc.src))
+
+rle_decoder = lv.img.decoder_create()
+rle_decoder.info_cb = get_image_info
+rle_decoder.open_cb = open_rle
+rle_decoder.read_line_cb = read_line_rle
+rle_decoder.close_cb = close_rle
+
+# One call per animated property and frame. An object animating several
+# properties together should use anim_batch.BatchAnim, which applies them
+# all from one callback per frame with values sampled in advance.
 
 def anim_x_cb(obj, v):
     obj.set_x(v)
@@ -138,11 +476,106 @@ def anim_img_zoom_cb(obj, v):
 def anim_img_rotate_cb(obj, v):
     obj.set_angle(v)
 
-global_font_cache = {}
+if prof is not None:
+    anim_x_cb = prof.wrap(anim_x_cb, 'anim_x_cb', 2)
+    anim_y_cb = prof.wrap(anim_y_cb, 'anim_y_cb', 2)
+    anim_width_cb = prof.wrap(anim_width_cb, 'anim_width_cb', 2)
+    anim_height_cb = prof.wrap(anim_height_cb, 'anim_height_cb', 2)
+    anim_img_zoom_cb = prof.wrap(anim_img_zoom_cb, 'anim_img_zoom_cb', 2)
+    anim_img_rotate_cb = prof.wrap(anim_img_rotate_cb, 'anim_img_rotate_cb', 2)
+    anim_batch.BatchAnim.apply = prof.wrap(anim_batch.BatchAnim.apply, 'BatchAnim.apply', 2)
+
+def asset_path(name):
+    # Bundled assets resolve through the bundle index without a filesystem open.
+    if assets is not None and name in assets:
+        return "R:" + name
+    return "Z:" + name
+
+# (family, size) -> builtin lv.font_<family>_<size>, collected once from the
+# lv module so resolving a font never has to eval() an attribute name.
+builtin_fonts = None
+def get_builtin_fonts():
+    global builtin_fonts
+    if builtin_fonts is None:
+        builtin_fonts = {}
+        for name in dir(lv):
+            if name.startswith('font_'):
+                parts = name[5:].rsplit('_', 1)
+                if len(parts) == 2 and parts[1].isdigit():
+                    builtin_fonts[(parts[0], int(parts[1]))] = getattr(lv, name)
+    return builtin_fonts
+
+# Loaded fonts and bundle image descriptors share one byte-budgeted LRU
+# cache. An asset used while a screen is built stays pinned until that
+# screen is deleted; one used outside a screen (shared styles) stays pinned.
+
+ASSET_CACHE_SIZE = 128 * 1024
+
+def release_asset(key, value):
+    if key[0] == 'font':
+        lv.font_free(value)
+
+asset_cache = lru_cache.LRUCache(ASSET_CACHE_SIZE, release_asset)
+
+# Screens are built on first navigation and deleted when left, see screen_manager.py.
+ui = screen_manager.ScreenManager()
+ui.on_release = asset_cache.unpin
+
+def cached_asset(key):
+    value = asset_cache.get(key)
+    if value is not None:
+        asset_cache.pin(key)
+        ui.hold(key)
+    return value
+
+def cache_asset(key, value, size):
+    asset_cache.put(key, value, size, True)
+    ui.hold(key)
+
+def asset_size(path):
+    name = path[2:]
+    if path[0] == 'R':
+        return len(assets.get(name))
+    try:
+        return uos.stat(name)[6]
+    except OSError:
+        return 0
+
+def cache_stats():
+    '''
+    Hits, misses, evictions and resident bytes of every asset cache.
+    '''
+    return {
+        'assets': asset_cache.stats(),
+        'png': png_cache.stats(),
+        'png_streams': png_streams.stats(),
+        'rle': rle_images.stats(),
+    }
+
+def load_font(family, size):
+    key = ('font', family, size)
+    font = cached_asset(key)
+    if font is None:
+        path = asset_path(f"MicroPython/lv_font_{family}_{size}.fnt")
+        try:
+            font = lv.font_load(path)
+        except:
+            font = None
+        if font is not None:
+            # The loaded glyph data takes about as much heap as the file.
+            cache_asset(key, font, asset_size(path))
+    return font
+
+# (family, size) requested -> (family, size) of the font it resolved to.
+font_resolution = {}
 def test_font(font_family, font_size):
-    global global_font_cache
-    if font_family + str(font_size) in global_font_cache:
-        return global_font_cache[font_family + str(font_size)]
+    key = (font_family, font_size)
+    builtin = get_builtin_fonts()
+    resolved = font_resolution.get(key)
+    if resolved is not None:
+        font = builtin.get(resolved) or load_font(*resolved)
+        if font is not None:
+            return font
     if font_size % 2:
         candidates = [
             (font_family, font_size),
@@ -158,42 +591,123 @@ def test_font(font_family, font_size):
             ("montserrat", font_size),
             ("montserrat", 16)
         ]
-    for (family, size) in candidates:
-        try:
-            if eval(f'lv.font_{family}_{size}'):
-                global_font_cache[font_family + str(font_size)] = eval(f'lv.font_{family}_{size}')
-                if family != font_family or size != font_size:
-                    print(f'WARNING: lv.font_{family}_{size} is used!')
-                return eval(f'lv.font_{family}_{size}')
-        except AttributeError:
-            try:
-                load_font = lv.font_load(f"Z:MicroPython/lv_font_{family}_{size}.fnt")
-                global_font_cache[font_family + str(font_size)] = load_font
-                return load_font
-            except:
-                if family == font_family and size == font_size:
+    for candidate in candidates:
+        family, size = candidate
+        font = builtin.get(candidate)
+        if font is not None:
+            if candidate != key:
+                print(f'WARNING: lv.font_{family}_{size} is used!')
+        else:
+            font = load_font(family, size)
+            if font is None:
+                if candidate == key:
                     print(f'WARNING: lv.font_{family}_{size} is NOT supported!')
+                continue
+        font_resolution[key] = candidate
+        return font
 
-global_image_cache = {}
-def load_image(file):
-    global global_image_cache
-    if file in global_image_cache:
-        return global_image_cache[file]
-    try:
-        with open(file,'rb') as f:
-            data = f.read()
-    except:
-        print(f'Could not open {file}')
-        sys.exit()
-
-    img = lv.img_dsc_t({
-        'data_size': len(data),
-        'data': data
+def bin_image_header(data):
+    # LVGL .bin image: 4-byte lv_img_header_t (cf:5, always_zero:3,
+    # reserved:2, w:11, h:11) followed by the pixel data.
+    header = ustruct.unpack_from('<L', data, 0)[0]
+    return header & 0x1f, (header >> 10) & 0x7ff, (header >> 21) & 0x7ff
+
+def bin_image_fits(cf, w, h, size):
+    # A true color .bin of size bytes holds pixels of the size this build
+    # expects; one converted for another LV_COLOR_DEPTH does not.
+    px = TRUE_COLOR_PX_SIZE.get(cf)
+    return px is None or size == 4 + w * h * px
+
+def convert_bin_image(data):
+    '''
+    Convert a 32-bit TRUE_COLOR_ALPHA .bin (BGRA8888) to the RGB565 + alpha
+    layout of a 16-bit build. Returns None for the other depth mismatches.
+    '''
+    cf, w, h = bin_image_header(data)
+    if COLOR_SIZE != 2 or cf != lv.img.CF.TRUE_COLOR_ALPHA or len(data) != 4 + w * h * 4:
+        return None
+    img = bytearray(data)
+    pixels = memoryview(img)[4:]
+    imagetools.swap_red_blue(pixels)
+    imagetools.rgba8888_to_rgb565a8(pixels, COLOR_IS_SWAPPED)
+    return img[:4 + w * h * 3]
+
+def bin_image_dsc(data):
+    cf, w, h = bin_image_header(data)
+    return lv.img_dsc_t({
+        'header': {'cf': cf, 'w': w, 'h': h},
+        'data_size': len(data) - 4,
+        'data': memoryview(data)[4:]
     })
-    global_image_cache[file] = img
+
+# Use the run-length encoded sibling of a .bin image when the build has one.
+RLE_IMAGES = True
+
+def rle_sibling(file):
+    # The .rle next to a .bin, if there is one with this build's pixel size.
+    # Only its header is read; a missing or mismatched one is not remembered,
+    # so a later conversion is picked up.
+    rle_file = file[:-4] + '.rle'
+    path = ("R:" if assets is not None and rle_file in assets else "Z:") + rle_file
+    head = read_asset(path, rle_image.HEADER_SIZE)
+    header = None if head is None else rle_image.read_header(head)
+    if header is None:
+        return None
+    if TRUE_COLOR_PX_SIZE.get(header[0]) != header[1]:
+        if rle_file not in rle_mismatched:
+            rle_mismatched.add(rle_file)
+            print(f'WARNING: {rle_file} is not for LV_COLOR_DEPTH {COLOR_SIZE * 8}, using {file}')
+        return None
+    return rle_file
+
+def load_image(file):
+    # Images held in RAM are cached under the requested name, so the .rle
+    # probe only runs when they are not loaded yet; path sources probe when
+    # their screen is built, reading at most one header.
+    key = ('img', file)
+    cached = cached_asset(key)
+    if cached is not None:
+        return cached[0]
+    if RLE_IMAGES and file.endswith('.bin'):
+        file = rle_sibling(file) or file
+    data = None
+    if assets is not None:
+        data = assets.get(file)
+    if data is not None:
+        fmt = assets.format(file)
+    else:
+        # Files are handed to LVGL as path sources: set_src and layout use
+        # the header in image_index, and the pixels are read when drawn.
+        path = "Z:" + file
+        info = file_image_info(path)
+        if info is None:
+            print(f'Could not open {file}')
+            sys.exit()
+        if info[3] != asset_bundle.FMT_LV_IMG or bin_image_fits(info[2], info[0], info[1], uos.stat(file)[6]):
+            return path
+        # Pixels for another color depth: converted in RAM below.
+        data = read_asset(path)
+        fmt = asset_bundle.FMT_LV_IMG
+
+    if fmt == asset_bundle.FMT_LV_IMG:
+        cf, w, h = bin_image_header(data)
+        if not bin_image_fits(cf, w, h, len(data)):
+            data = convert_bin_image(data)
+            if data is None:
+                print(f'WARNING: {file} was not converted for LV_COLOR_DEPTH {COLOR_SIZE * 8}, not shown')
+                return None
+        img = bin_image_dsc(data)
+    else:
+        img = lv.img_dsc_t({
+            'data_size': len(data),
+            'data': data
+        })
+    # Keep the data alive alongside the descriptor that points into it.
+    cache_asset(key, (img, data), len(data))
     return img
 
 def calendar_event_handler(e,obj):
+    event_stats.count += 1
     code = e.get_code()
 
     if code == lv.EVENT.VALUE_CHANGED:
@@ -203,49 +717,34 @@ def calendar_event_handler(e,obj):
             source.set_highlighted_dates([date], 1)
 
 def spinbox_increment_event_cb(e, obj):
+    event_stats.count += 1
     code = e.get_code()
     if code == lv.EVENT.SHORT_CLICKED or code == lv.EVENT.LONG_PRESSED_REPEAT:
         obj.increment()
 def spinbox_decrement_event_cb(e, obj):
+    event_stats.count += 1
     code = e.get_code()
     if code == lv.EVENT.SHORT_CLICKED or code == lv.EVENT.LONG_PRESSED_REPEAT:
         obj.decrement()
 
 def digital_clock_cb(timer, obj, current_time, show_second, use_ampm):
-    hour = int(current_time[0])
-    minute = int(current_time[1])
-    second = int(current_time[2])
-    ampm = current_time[3]
-    second = second + 1
-    if second == 60:
-        second = 0
-        minute = minute + 1
-        if minute == 60:
-            minute = 0
-            hour = hour + 1
-            if use_ampm:
-                if hour == 12:
-                    if ampm == 'AM':
-                        ampm = 'PM'
-                    elif ampm == 'PM':
-                        ampm = 'AM'
-                if hour > 12:
-                    hour = hour % 12
-    hour = hour % 24
-    if use_ampm:
-        if show_second:
-            obj.set_text("%d:%02d:%02d %s" %(hour, minute, second, ampm))
-        else:
-            obj.set_text("%d:%02d %s" %(hour, minute, ampm))
-    else:
-        if show_second:
-            obj.set_text("%d:%02d:%02d" %(hour, minute, second))
-        else:
-            obj.set_text("%d:%02d" %(hour, minute))
-    current_time[0] = hour
-    current_time[1] = minute
-    current_time[2] = second
-    current_time[3] = ampm
+    # Generated screens pass [hour, minute, second, ampm]; the DigitalClock
+    # is created on the first tick and kept in the list after those fields.
+    if len(current_time) < 5:
+        current_time.append(digital_clock.DigitalClock(obj, current_time[0],
+            current_time[1], current_time[2], current_time[3], show_second, use_ampm))
+    clock = current_time[4]
+    clock.tick(timer)
+    # Keep the fields current for code that reads them; small ints and the
+    # interned suffix strings do not allocate.
+    state = clock.state
+    current_time[0] = (state >> 16) & 0xff
+    current_time[1] = (state >> 8) & 0xff
+    current_time[2] = state & 0xff
+    current_time[3] = clock.ampm[state >> 24]
+
+if prof is not None:
+    digital_clock.DigitalClock.tick = prof.wrap(digital_clock.DigitalClock.tick, 'DigitalClock.tick', 2)
 
 def analog_clock_cb(timer, obj):
     datetime = time.localtime()
@@ -253,255 +752,286 @@ def analog_clock_cb(timer, obj):
     if hour >= 12: hour = hour - 12
     obj.set_time(hour, datetime[4], datetime[5])
 
+def new_date_picker(scr):
+    picker = date_picker.DatePicker(scr)
+    picker.calendar.add_event_cb(traced(lambda e: datetext_calendar_event_handler(e, picker)), lv.EVENT.VALUE_CHANGED, None)
+    return picker
+
 def datetext_event_handler(e, obj):
+    event_stats.count += 1
     code = e.get_code()
-    target = e.get_target()
     if code == lv.EVENT.FOCUSED:
-        if obj is None:
-            bg = lv.layer_top()
-            bg.add_flag(lv.obj.FLAG.CLICKABLE)
-            obj = lv.calendar(bg)
-            scr = target.get_screen()
-            scr_height = scr.get_height()
-            scr_width = scr.get_width()
-            obj.set_size(int(scr_width * 0.8), int(scr_height * 0.8))
-            datestring = target.get_text()
-            year = int(datestring.split('/')[0])
-            month = int(datestring.split('/')[1])
-            day = int(datestring.split('/')[2])
-            obj.set_showed_date(year, month)
-            highlighted_days=[lv.calendar_date_t({'year':year, 'month':month, 'day':day})]
-            obj.set_highlighted_dates(highlighted_days, 1)
-            obj.align(lv.ALIGN.CENTER, 0, 0)
-            lv.calendar_header_arrow(obj)
-            obj.add_event_cb(lambda e: datetext_calendar_event_handler(e, target), lv.EVENT.ALL, None)
-            scr.update_layout()
-
-def datetext_calendar_event_handler(e, obj):
+        target = e.get_target()
+        date_picker.get(target.get_screen(), new_date_picker).show(target)
+
+def datetext_calendar_event_handler(e, picker):
+    event_stats.count += 1
     code = e.get_code()
-    target = e.get_current_target()
     if code == lv.EVENT.VALUE_CHANGED:
-        date = lv.calendar_date_t()
-        if target.get_pressed_date(date) == lv.RES.OK:
-            obj.set_text(f"{date.year}/{date.month}/{date.day}")
-            bg = lv.layer_top()
-            bg.clear_flag(lv.obj.FLAG.CLICKABLE)
-            bg.set_style_bg_opa(lv.OPA.TRANSP, 0)
-            target.delete()
-
-# Create screen
-screen = lv.obj()
-screen.set_size(240, 280)
-screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.AUTO)
-# Set style for screen, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen.set_style_bg_opa(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_btn_1
-screen_btn_1 = lv.btn(screen)
-screen_btn_1_label = lv.label(screen_btn_1)
-screen_btn_1_label.set_text("Button")
-screen_btn_1_label.set_long_mode(lv.label.LONG.WRAP)
-screen_btn_1_label.set_width(lv.pct(100))
-screen_btn_1_label.align(lv.ALIGN.CENTER, 0, 0)
-screen_btn_1.set_style_pad_all(0, lv.STATE.DEFAULT)
-screen_btn_1.set_pos(22, 191)
-screen_btn_1.set_size(100, 50)
-# Set style for screen_btn_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_btn_1.set_style_bg_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_bg_color(lv.color_hex(0x2195f6), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_radius(5, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_text_color(lv.color_hex(0xffffff), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_text_font(test_font("montserratMedium", 16), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_text_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_btn_1.set_style_text_align(lv.TEXT_ALIGN.CENTER, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_label_1
-screen_label_1 = lv.label(screen)
-screen_label_1.set_text("lvgl test")
-screen_label_1.set_long_mode(lv.label.LONG.WRAP)
-screen_label_1.set_width(lv.pct(100))
-screen_label_1.set_pos(70, 15)
-screen_label_1.set_size(100, 32)
-# Set style for screen_label_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_label_1.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_radius(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_color(lv.color_hex(0x000000), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_font(test_font("montserratMedium", 20), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_letter_space(2, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_line_space(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_text_align(lv.TEXT_ALIGN.CENTER, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_bg_opa(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_pad_top(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_pad_right(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_pad_bottom(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_pad_left(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_1.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_img_1
-screen_img_1 = lv.img(screen)
-screen_img_1.set_src("B:MicroPython/_test_img_alpha_100x100.bin")
-screen_img_1.add_flag(lv.obj.FLAG.CLICKABLE)
-screen_img_1.set_pivot(50,50)
-screen_img_1.set_angle(0)
-screen_img_1.set_pos(22, 64)
-screen_img_1.set_size(100, 100)
-# Set style for screen_img_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_img_1.set_style_img_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_img_1.set_style_radius(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_img_1.set_style_clip_corner(True, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_label_2
-screen_label_2 = lv.label(screen)
-screen_label_2.set_text("Label")
-screen_label_2.set_long_mode(lv.label.LONG.WRAP)
-screen_label_2.set_width(lv.pct(100))
-screen_label_2.set_pos(131, 72)
-screen_label_2.set_size(100, 14)
-# Set style for screen_label_2, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_label_2.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_radius(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_color(lv.color_hex(0x000000), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_font(test_font("montserratMedium", 16), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_letter_space(2, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_line_space(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_text_align(lv.TEXT_ALIGN.CENTER, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_bg_opa(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_pad_top(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_pad_right(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_pad_bottom(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_pad_left(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_label_2.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-screen.update_layout()
-# Create screen_1
-screen_1 = lv.obj()
-screen_1.set_size(240, 280)
-screen_1.set_scrollbar_mode(lv.SCROLLBAR_MODE.AUTO)
-# Set style for screen_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_1.set_style_bg_opa(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_1_label_1
-screen_1_label_1 = lv.label(screen_1)
-screen_1_label_1.set_text("Label")
-screen_1_label_1.set_long_mode(lv.label.LONG.WRAP)
-screen_1_label_1.set_width(lv.pct(100))
-screen_1_label_1.set_pos(68, 54)
-screen_1_label_1.set_size(100, 32)
-# Set style for screen_1_label_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_1_label_1.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_radius(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_color(lv.color_hex(0x000000), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_font(test_font("montserratMedium", 16), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_letter_space(2, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_line_space(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_text_align(lv.TEXT_ALIGN.CENTER, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_bg_opa(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_pad_top(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_pad_right(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_pad_bottom(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_pad_left(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_label_1.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Create screen_1_sw_1
-screen_1_sw_1 = lv.switch(screen_1)
-screen_1_sw_1.set_pos(93, 113)
-screen_1_sw_1.set_size(40, 20)
-# Set style for screen_1_sw_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_1_sw_1.set_style_bg_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_bg_color(lv.color_hex(0xe6e2e6), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_radius(10, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-# Set style for screen_1_sw_1, Part: lv.PART.INDICATOR, State: lv.STATE.CHECKED.
-screen_1_sw_1.set_style_bg_opa(255, lv.PART.INDICATOR|lv.STATE.CHECKED)
-screen_1_sw_1.set_style_bg_color(lv.color_hex(0x2195f6), lv.PART.INDICATOR|lv.STATE.CHECKED)
-screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, lv.PART.INDICATOR|lv.STATE.CHECKED)
-screen_1_sw_1.set_style_border_width(0, lv.PART.INDICATOR|lv.STATE.CHECKED)
-
-# Set style for screen_1_sw_1, Part: lv.PART.KNOB, State: lv.STATE.DEFAULT.
-screen_1_sw_1.set_style_bg_opa(255, lv.PART.KNOB|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_bg_color(lv.color_hex(0xffffff), lv.PART.KNOB|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, lv.PART.KNOB|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_border_width(0, lv.PART.KNOB|lv.STATE.DEFAULT)
-screen_1_sw_1.set_style_radius(10, lv.PART.KNOB|lv.STATE.DEFAULT)
-
-# Create screen_1_btn_1
-screen_1_btn_1 = lv.btn(screen_1)
-screen_1_btn_1_label = lv.label(screen_1_btn_1)
-screen_1_btn_1_label.set_text("Button222")
-screen_1_btn_1_label.set_long_mode(lv.label.LONG.WRAP)
-screen_1_btn_1_label.set_width(lv.pct(100))
-screen_1_btn_1_label.align(lv.ALIGN.CENTER, 0, 0)
-screen_1_btn_1.set_style_pad_all(0, lv.STATE.DEFAULT)
-screen_1_btn_1.set_pos(68, 180)
-screen_1_btn_1.set_size(100, 50)
-# Set style for screen_1_btn_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
-screen_1_btn_1.set_style_bg_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_bg_color(lv.color_hex(0x2195f6), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_border_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_radius(5, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_shadow_width(0, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_text_color(lv.color_hex(0xffffff), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_text_font(test_font("montserratMedium", 16), lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_text_opa(255, lv.PART.MAIN|lv.STATE.DEFAULT)
-screen_1_btn_1.set_style_text_align(lv.TEXT_ALIGN.CENTER, lv.PART.MAIN|lv.STATE.DEFAULT)
-
-screen_1.update_layout()
-
-def screen_event_handler(e):
-    code = e.get_code()
-    indev = lv.indev_get_act()
-    gestureDir = lv.DIR.NONE
-    if indev is not None: gestureDir = indev.get_gesture_dir()
-    if (code == lv.EVENT.GESTURE and lv.DIR.LEFT == gestureDir):
-        if indev is not None: indev.wait_release()
-        pass
-        lv.scr_load_anim(screen_1, lv.SCR_LOAD_ANIM.MOVE_LEFT, 200, 200, False)
-screen.add_event_cb(lambda e: screen_event_handler(e), lv.EVENT.ALL, None)
-
-def screen_btn_1_event_handler(e):
-    code = e.get_code()
-    if (code == lv.EVENT.PRESSED):
-        pass
-        screen_img_1.add_flag(lv.obj.FLAG.HIDDEN)
-        
-    if (code == lv.EVENT.RELEASED):
-        pass
-        screen_img_1.clear_flag(lv.obj.FLAG.HIDDEN)
-        
-screen_btn_1.add_event_cb(lambda e: screen_btn_1_event_handler(e), lv.EVENT.ALL, None)
-
-def screen_img_1_event_handler(e):
-    code = e.get_code()
-    if (code == lv.EVENT.CLICKED):
-        pass
-screen_img_1.add_event_cb(lambda e: screen_img_1_event_handler(e), lv.EVENT.ALL, None)
+        picker.pick()
 
-def screen_1_event_handler(e):
-    code = e.get_code()
-    indev = lv.indev_get_act()
-    gestureDir = lv.DIR.NONE
-    if indev is not None: gestureDir = indev.get_gesture_dir()
-    if (code == lv.EVENT.GESTURE and lv.DIR.LEFT == gestureDir):
-        if indev is not None: indev.wait_release()
-        pass
-        lv.scr_load_anim(screen, lv.SCR_LOAD_ANIM.MOVE_LEFT, 200, 200, False)
-screen_1.add_event_cb(lambda e: screen_1_event_handler(e), lv.EVENT.ALL, None)
+# Style selectors and colors used by the styles and screens below, evaluated
+# once at import instead of at every set_style_* call.
+MAIN_DEFAULT = lv.PART.MAIN|lv.STATE.DEFAULT
+INDICATOR_CHECKED = lv.PART.INDICATOR|lv.STATE.CHECKED
+KNOB_DEFAULT = lv.PART.KNOB|lv.STATE.DEFAULT
+
+COLOR_000000 = lv.color_hex(0x000000)
+COLOR_FFFFFF = lv.color_hex(0xffffff)
+COLOR_2195F6 = lv.color_hex(0x2195f6)
+COLOR_E6E2E6 = lv.color_hex(0xe6e2e6)
+
+# Shared styles: property sets used by several widgets are built once and
+# attached with add_style instead of being copied into each widget's local style.
+style_screen_main_default = lv.style_t()
+style_screen_main_default.init()
+style_screen_main_default.set_bg_opa(0)
+
+style_btn_main_default = lv.style_t()
+style_btn_main_default.init()
+style_btn_main_default.set_bg_opa(255)
+style_btn_main_default.set_bg_color(COLOR_2195F6)
+style_btn_main_default.set_bg_grad_dir(lv.GRAD_DIR.NONE)
+style_btn_main_default.set_border_width(0)
+style_btn_main_default.set_radius(5)
+style_btn_main_default.set_shadow_width(0)
+style_btn_main_default.set_text_color(COLOR_FFFFFF)
+style_btn_main_default.set_text_font(test_font("montserratMedium", 16))
+style_btn_main_default.set_text_opa(255)
+style_btn_main_default.set_text_align(lv.TEXT_ALIGN.CENTER)
+
+style_label_main_default = lv.style_t()
+style_label_main_default.init()
+style_label_main_default.set_border_width(0)
+style_label_main_default.set_radius(0)
+style_label_main_default.set_text_color(COLOR_000000)
+style_label_main_default.set_text_opa(255)
+style_label_main_default.set_text_letter_space(2)
+style_label_main_default.set_text_line_space(0)
+style_label_main_default.set_text_align(lv.TEXT_ALIGN.CENTER)
+style_label_main_default.set_bg_opa(0)
+style_label_main_default.set_pad_top(0)
+style_label_main_default.set_pad_right(0)
+style_label_main_default.set_pad_bottom(0)
+style_label_main_default.set_pad_left(0)
+style_label_main_default.set_shadow_width(0)
+
+def setup_screen_btn_1(screen):
+    screen_btn_1 = lv.btn(screen)
+    screen_btn_1_label = lv.label(screen_btn_1)
+    screen_btn_1_label.set_text("Button")
+    screen_btn_1_label.set_long_mode(lv.label.LONG.WRAP)
+    screen_btn_1_label.set_width(lv.pct(100))
+    screen_btn_1_label.align(lv.ALIGN.CENTER, 0, 0)
+    screen_btn_1.set_style_pad_all(0, lv.STATE.DEFAULT)
+    screen_btn_1.set_pos(22, 191)
+    screen_btn_1.set_size(100, 50)
+    # Set style for screen_btn_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_btn_1.add_style(style_btn_main_default, MAIN_DEFAULT)
+    return screen_btn_1
+
+def setup_screen_label_1(screen):
+    screen_label_1 = lv.label(screen)
+    screen_label_1.set_text("lvgl test")
+    screen_label_1.set_long_mode(lv.label.LONG.WRAP)
+    screen_label_1.set_width(lv.pct(100))
+    screen_label_1.set_pos(70, 15)
+    screen_label_1.set_size(100, 32)
+    # Set style for screen_label_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_label_1.add_style(style_label_main_default, MAIN_DEFAULT)
+    screen_label_1.set_style_text_font(test_font("montserratMedium", 20), MAIN_DEFAULT)
+    return screen_label_1
+
+def setup_screen_img_1(screen):
+    screen_img_1 = lv.img(screen)
+    screen_img_1.set_src(load_image("MicroPython/_test_img_alpha_100x100.bin"))
+    screen_img_1.add_flag(lv.obj.FLAG.CLICKABLE)
+    screen_img_1.set_pivot(50,50)
+    screen_img_1.set_angle(0)
+    screen_img_1.set_pos(22, 64)
+    screen_img_1.set_size(100, 100)
+    # Set style for screen_img_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_img_1.set_style_img_opa(255, MAIN_DEFAULT)
+    screen_img_1.set_style_radius(0, MAIN_DEFAULT)
+    screen_img_1.set_style_clip_corner(True, MAIN_DEFAULT)
+    return screen_img_1
+
+def setup_screen_label_2(screen):
+    screen_label_2 = lv.label(screen)
+    screen_label_2.set_text("Label")
+    screen_label_2.set_long_mode(lv.label.LONG.WRAP)
+    screen_label_2.set_width(lv.pct(100))
+    screen_label_2.set_pos(131, 72)
+    screen_label_2.set_size(100, 14)
+    # Set style for screen_label_2, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_label_2.add_style(style_label_main_default, MAIN_DEFAULT)
+    screen_label_2.set_style_text_font(test_font("montserratMedium", 16), MAIN_DEFAULT)
+    return screen_label_2
+
+def setup_scr_screen():
+    # Create screen
+    screen = lv.obj()
+    screen.set_size(240, 280)
+    screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.AUTO)
+    # Set style for screen, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen.add_style(style_screen_main_default, MAIN_DEFAULT)
+
+    screen_btn_1 = setup_screen_btn_1(screen)
+    screen_label_1 = setup_screen_label_1(screen)
+    screen_img_1 = setup_screen_img_1(screen)
+    screen_label_2 = setup_screen_label_2(screen)
+
+    screen.update_layout()
+    def screen_event_handler(e):
+        event_stats.count += 1
+        code = e.get_code()
+        indev = lv.indev_get_act()
+        gestureDir = lv.DIR.NONE
+        if indev is not None: gestureDir = indev.get_gesture_dir()
+        if (code == lv.EVENT.GESTURE and lv.DIR.LEFT == gestureDir):
+            if indev is not None: indev.wait_release()
+            pass
+            ui.load('screen_1', lv.SCR_LOAD_ANIM.MOVE_LEFT, 200, 200)
+    screen.add_event_cb(traced(screen_event_handler), lv.EVENT.GESTURE, None)
+
+    def screen_btn_1_event_handler(e):
+        event_stats.count += 1
+        code = e.get_code()
+        if (code == lv.EVENT.PRESSED):
+            pass
+            screen_img_1.add_flag(lv.obj.FLAG.HIDDEN)
+
+        if (code == lv.EVENT.RELEASED):
+            pass
+            screen_img_1.clear_flag(lv.obj.FLAG.HIDDEN)
+
+    screen_btn_1.add_event_cb(traced(screen_btn_1_event_handler), lv.EVENT.PRESSED, None)
+    screen_btn_1.add_event_cb(traced(screen_btn_1_event_handler), lv.EVENT.RELEASED, None)
+
+    def screen_img_1_event_handler(e):
+        event_stats.count += 1
+        code = e.get_code()
+        if (code == lv.EVENT.CLICKED):
+            pass
+    screen_img_1.add_event_cb(traced(screen_img_1_event_handler), lv.EVENT.CLICKED, None)
+    return screen
+
+def setup_screen_1_label_1(screen_1):
+    screen_1_label_1 = lv.label(screen_1)
+    screen_1_label_1.set_text("Label")
+    screen_1_label_1.set_long_mode(lv.label.LONG.WRAP)
+    screen_1_label_1.set_width(lv.pct(100))
+    screen_1_label_1.set_pos(68, 54)
+    screen_1_label_1.set_size(100, 32)
+    # Set style for screen_1_label_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_1_label_1.add_style(style_label_main_default, MAIN_DEFAULT)
+    screen_1_label_1.set_style_text_font(test_font("montserratMedium", 16), MAIN_DEFAULT)
+    return screen_1_label_1
+
+def setup_screen_1_sw_1(screen_1):
+    screen_1_sw_1 = lv.switch(screen_1)
+    screen_1_sw_1.set_pos(93, 113)
+    screen_1_sw_1.set_size(40, 20)
+    # Set style for screen_1_sw_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_1_sw_1.set_style_bg_opa(255, MAIN_DEFAULT)
+    screen_1_sw_1.set_style_bg_color(COLOR_E6E2E6, MAIN_DEFAULT)
+    screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, MAIN_DEFAULT)
+    screen_1_sw_1.set_style_border_width(0, MAIN_DEFAULT)
+    screen_1_sw_1.set_style_radius(10, MAIN_DEFAULT)
+    screen_1_sw_1.set_style_shadow_width(0, MAIN_DEFAULT)
+
+    # Set style for screen_1_sw_1, Part: lv.PART.INDICATOR, State: lv.STATE.CHECKED.
+    screen_1_sw_1.set_style_bg_opa(255, INDICATOR_CHECKED)
+    screen_1_sw_1.set_style_bg_color(COLOR_2195F6, INDICATOR_CHECKED)
+    screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, INDICATOR_CHECKED)
+    screen_1_sw_1.set_style_border_width(0, INDICATOR_CHECKED)
+
+    # Set style for screen_1_sw_1, Part: lv.PART.KNOB, State: lv.STATE.DEFAULT.
+    screen_1_sw_1.set_style_bg_opa(255, KNOB_DEFAULT)
+    screen_1_sw_1.set_style_bg_color(COLOR_FFFFFF, KNOB_DEFAULT)
+    screen_1_sw_1.set_style_bg_grad_dir(lv.GRAD_DIR.NONE, KNOB_DEFAULT)
+    screen_1_sw_1.set_style_border_width(0, KNOB_DEFAULT)
+    screen_1_sw_1.set_style_radius(10, KNOB_DEFAULT)
+    return screen_1_sw_1
+
+def setup_screen_1_btn_1(screen_1):
+    screen_1_btn_1 = lv.btn(screen_1)
+    screen_1_btn_1_label = lv.label(screen_1_btn_1)
+    screen_1_btn_1_label.set_text("Button222")
+    screen_1_btn_1_label.set_long_mode(lv.label.LONG.WRAP)
+    screen_1_btn_1_label.set_width(lv.pct(100))
+    screen_1_btn_1_label.align(lv.ALIGN.CENTER, 0, 0)
+    screen_1_btn_1.set_style_pad_all(0, lv.STATE.DEFAULT)
+    screen_1_btn_1.set_pos(68, 180)
+    screen_1_btn_1.set_size(100, 50)
+    # Set style for screen_1_btn_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_1_btn_1.add_style(style_btn_main_default, MAIN_DEFAULT)
+    return screen_1_btn_1
+
+def setup_scr_screen_1():
+    # Create screen_1
+    screen_1 = lv.obj()
+    screen_1.set_size(240, 280)
+    screen_1.set_scrollbar_mode(lv.SCROLLBAR_MODE.AUTO)
+    # Set style for screen_1, Part: lv.PART.MAIN, State: lv.STATE.DEFAULT.
+    screen_1.add_style(style_screen_main_default, MAIN_DEFAULT)
+
+    screen_1_label_1 = setup_screen_1_label_1(screen_1)
+    screen_1_sw_1 = setup_screen_1_sw_1(screen_1)
+    screen_1_btn_1 = setup_screen_1_btn_1(screen_1)
+
+    screen_1.update_layout()
+
+    def screen_1_event_handler(e):
+        event_stats.count += 1
+        code = e.get_code()
+        indev = lv.indev_get_act()
+        gestureDir = lv.DIR.NONE
+        if indev is not None: gestureDir = indev.get_gesture_dir()
+        if (code == lv.EVENT.GESTURE and lv.DIR.LEFT == gestureDir):
+            if indev is not None: indev.wait_release()
+            pass
+            ui.load('screen', lv.SCR_LOAD_ANIM.MOVE_LEFT, 200, 200)
+    screen_1.add_event_cb(traced(screen_1_event_handler), lv.EVENT.GESTURE, None)
+    return screen_1
+
+ui.register('screen', setup_scr_screen)
+ui.register('screen_1', setup_scr_screen_1)
 
 # content from custom.py
 
-# Load the default screen
-lv.scr_load(screen)
+def main(flush_cb=None, read_cb=None, alive=None):
+    '''
+    Bring up the display, load the default screen and run the UI until
+    alive() returns False. Boot code on the board passes the panel's
+    flush_cb, the touch read_cb and, if the loop should end, alive; without
+    flush_cb the SDL simulator is used.
+    '''
+    if flush_cb is None:
+        import SDL
+        # With auto_refresh=False the SDL driver neither runs LVGL timers
+        # nor advances the tick; lv_loop.EventLoop does both.
+        SDL.init(w=240,h=280,auto_refresh=False)
+        flush_cb, read_cb, alive = SDL.monitor_flush, SDL.mouse_read, SDL.check
+    event_loop = lv_loop.EventLoop(alive, tick_inc=True)
+
+    def pointer_read(drv, data):
+        read_cb(drv, data)
+        # Keep reading every pass while the pointer is pressed so drags do
+        # not wait out LV_INDEV_DEF_READ_PERIOD.
+        if data.state == lv.INDEV_STATE.PRESSED:
+            event_loop.wake()
+
+    init_display(flush_cb, pointer_read if read_cb is not None else None)
+
+    if prof is not None:
+        prof.show_overlay()
+
+    # Load the default screen
+    ui.load('screen')
 
-while SDL.check():
-    time.sleep_ms(5)
+    # Sleep until the next LVGL timer is due instead of polling every 5 ms.
+    event_loop.run()
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+'''
+Pixel format conversion helpers for the lodepng decoder in gui_guider.py.
+
+Every routine works on the whole decoded buffer in one pass instead of
+casting each pixel to an lv.color_t.
+'''
+
+try:
+    from imagetools_viper import swap_red_blue as _swap_red_blue_native
+    from imagetools_viper import rgba8888_to_rgb565a8 as _rgba8888_to_rgb565a8_native
+    from imagetools_viper import png_unfilter as _png_unfilter_native
+    from imagetools_viper import rle_decode_line as _rle_decode_line_native
+except (ImportError, SyntaxError, ValueError):
+    _swap_red_blue_native = None
+    _rgba8888_to_rgb565a8_native = None
+    _png_unfilter_native = None
+    _rle_decode_line_native = None
+
+
+def _swap_red_blue_slices(img_view):
+    # Extended slices are not available on every MicroPython build.
+    red = bytes(img_view[0::4])
+    img_view[0::4] = img_view[2::4]
+    img_view[2::4] = red
+
+
+def _swap_red_blue_loop(img_view):
+    for i in range(0, len(img_view), 4):
+        img_view[i], img_view[i + 2] = img_view[i + 2], img_view[i]
+
+
+def swap_red_blue_python(img_view):
+    try:
+        _swap_red_blue_slices(img_view)
+    except (NotImplementedError, TypeError):
+        _swap_red_blue_loop(img_view)
+
+
+def swap_red_blue(img_view):
+    '''
+    Swap the R and B channels of a RGBA8888/BGRA8888 buffer in place.
+    '''
+    if _swap_red_blue_native is not None:
+        _swap_red_blue_native(img_view, len(img_view))
+    else:
+        swap_red_blue_python(img_view)
+
+
+def rgba8888_to_rgb565a8_python(img_view, swap):
+    j = 0
+    for i in range(0, len(img_view), 4):
+        c = ((img_view[i] & 0xf8) << 8) | ((img_view[i + 1] & 0xfc) << 3) | (img_view[i + 2] >> 3)
+        a = img_view[i + 3]
+        if swap:
+            img_view[j] = c >> 8
+            img_view[j + 1] = c & 0xff
+        else:
+            img_view[j] = c & 0xff
+            img_view[j + 1] = c >> 8
+        img_view[j + 2] = a
+        j += 3
+
+
+def rgba8888_to_rgb565a8(img_view, swap):
+    '''
+    Convert a lodepng RGBA8888 buffer in place to LVGL's 16-bit
+    TRUE_COLOR_ALPHA layout: RGB565 (big endian when swap is set, matching
+    LV_COLOR_16_SWAP) followed by an alpha byte. The result occupies the
+    first 3/4 of the buffer.
+    '''
+    if _rgba8888_to_rgb565a8_native is not None:
+        _rgba8888_to_rgb565a8_native(img_view, len(img_view), 1 if swap else 0)
+    else:
+        rgba8888_to_rgb565a8_python(img_view, swap)
+
+
+def png_unfilter_python(ftype, row, prev, bpp):
+    size = len(row)
+    if ftype == 1:
+        for i in range(bpp, size):
+            row[i] = (row[i] + row[i - bpp]) & 0xff
+    elif ftype == 2:
+        for i in range(size):
+            row[i] = (row[i] + prev[i]) & 0xff
+    elif ftype == 3:
+        for i in range(size):
+            left = row[i - bpp] if i >= bpp else 0
+            row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xff
+    elif ftype == 4:
+        for i in range(size):
+            if i >= bpp:
+                a = row[i - bpp]
+                c = prev[i - bpp]
+            else:
+                a = c = 0
+            b = prev[i]
+            pa = abs(b - c)
+            pb = abs(a - c)
+            pc = abs(a + b - 2 * c)
+            if pa <= pb and pa <= pc:
+                row[i] = (row[i] + a) & 0xff
+            elif pb <= pc:
+                row[i] = (row[i] + b) & 0xff
+            else:
+                row[i] = (row[i] + c) & 0xff
+
+
+def png_unfilter(ftype, row, prev, bpp):
+    '''
+    Undo the PNG scanline filter ftype in place on row, given the already
+    unfiltered previous row (all zeros for the first row) and the number of
+    bytes per pixel.
+    '''
+    if _png_unfilter_native is not None:
+        _png_unfilter_native(ftype, row, prev, len(row), bpp)
+    else:
+        png_unfilter_python(ftype, row, prev, bpp)
+
+
+def rle_decode_line_python(src, pos, end, dst, px):
+    j = 0
+    while pos < end:
+        c = src[pos]
+        pos += 1
+        if c < 128:
+            n = (c + 1) * px
+            dst[j:j + n] = src[pos:pos + n]
+            pos += n
+            j += n
+        else:
+            pixel = src[pos:pos + px]
+            pos += px
+            for _ in range(c - 127):
+                dst[j:j + px] = pixel
+                j += px
+    return j
+
+
+def rle_decode_line(src, pos, end, dst, px):
+    '''
+    Expand the run-length packets in src[pos:end] (see rle_image.py) into
+    dst, px bytes per pixel. Returns the number of bytes written.
+    '''
+    if _rle_decode_line_native is not None:
+        return _rle_decode_line_native(src, pos, end, dst, px)
+    return rle_decode_line_python(src, pos, end, dst, px)
@@ -0,0 +1,106 @@
+'''
+Native (viper) pixel loops for imagetools.py. Kept in a module of their own
+so that firmware built without the native emitter can still import
+imagetools and fall back to the pure-Python loops.
+'''
+
+import micropython
+
+@micropython.viper
+def swap_red_blue(buf: ptr8, size: int):
+    i = 0
+    while i < size:
+        tmp = buf[i]
+        buf[i] = buf[i + 2]
+        buf[i + 2] = tmp
+        i += 4
+
+
+@micropython.viper
+def rgba8888_to_rgb565a8(buf: ptr8, size: int, swap: int):
+    i = 0
+    j = 0
+    while i < size:
+        c = ((buf[i] & 0xf8) << 8) | ((buf[i + 1] & 0xfc) << 3) | (buf[i + 2] >> 3)
+        a = buf[i + 3]
+        if swap:
+            buf[j] = c >> 8
+            buf[j + 1] = c
+        else:
+            buf[j] = c
+            buf[j + 1] = c >> 8
+        buf[j + 2] = a
+        i += 4
+        j += 3
+
+
+@micropython.viper
+def png_unfilter(ftype: int, row: ptr8, prev: ptr8, size: int, bpp: int):
+    i = 0
+    if ftype == 1:
+        i = bpp
+        while i < size:
+            row[i] = row[i] + row[i - bpp]
+            i += 1
+    elif ftype == 2:
+        while i < size:
+            row[i] = row[i] + prev[i]
+            i += 1
+    elif ftype == 3:
+        while i < bpp:
+            row[i] = row[i] + (prev[i] >> 1)
+            i += 1
+        while i < size:
+            row[i] = row[i] + ((row[i - bpp] + prev[i]) >> 1)
+            i += 1
+    elif ftype == 4:
+        while i < bpp:
+            row[i] = row[i] + prev[i]
+            i += 1
+        while i < size:
+            a = row[i - bpp]
+            b = prev[i]
+            c = prev[i - bpp]
+            pa = b - c
+            pb = a - c
+            pc = pa + pb
+            if pa < 0:
+                pa = 0 - pa
+            if pb < 0:
+                pb = 0 - pb
+            if pc < 0:
+                pc = 0 - pc
+            if pa <= pb and pa <= pc:
+                row[i] = row[i] + a
+            elif pb <= pc:
+                row[i] = row[i] + b
+            else:
+                row[i] = row[i] + c
+            i += 1
+
+
+@micropython.viper
+def rle_decode_line(src: ptr8, pos: int, end: int, dst: ptr8, px: int) -> int:
+    j = 0
+    while pos < end:
+        c = src[pos]
+        pos += 1
+        if c < 128:
+            n = (c + 1) * px
+            k = 0
+            while k < n:
+                dst[j + k] = src[pos + k]
+                k += 1
+            pos += n
+            j += n
+        else:
+            n = c - 127
+            while n > 0:
+                k = 0
+                while k < px:
+                    dst[j + k] = src[pos + k]
+                    k += 1
+                j += px
+                n -= 1
+            pos += px
+    return j
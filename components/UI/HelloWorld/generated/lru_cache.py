@@ -0,0 +1,93 @@
+'''
+Byte-budgeted LRU cache used for decoded images.
+'''
+
+from ucollections import OrderedDict
+
+
+class LRUCache:
+
+    def __init__(self, byte_limit, on_evict=None):
+        self.byte_limit = byte_limit
+        self.on_evict = on_evict
+        self.resident = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> [value, size, pins]
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries[key] = entry
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size, pinned=False):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.resident -= old[1]
+            self._release(key, old)
+        self._entries[key] = [value, size, 1 if pinned else 0]
+        self.resident += size
+        self.trim()
+
+    def pin(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[2] += 1
+
+    def unpin(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] > 0:
+            entry[2] -= 1
+            if self.resident > self.byte_limit:
+                self.trim()
+
+    def trim(self):
+        '''
+        Evict least recently used, unpinned entries until the cache fits
+        its byte limit again.
+        '''
+        if self.resident <= self.byte_limit:
+            return
+        for key in [k for k in self._entries]:
+            if self.resident <= self.byte_limit:
+                break
+            entry = self._entries[key]
+            if entry[2]:
+                continue
+            del self._entries[key]
+            self.resident -= entry[1]
+            self.evictions += 1
+            self._release(key, entry)
+
+    def clear(self):
+        for key in [k for k in self._entries]:
+            if not self._entries[key][2]:
+                entry = self._entries.pop(key)
+                self.resident -= entry[1]
+                self._release(key, entry)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'resident': self.resident,
+            'byte_limit': self.byte_limit,
+        }
+
+    def _release(self, key, entry):
+        if self.on_evict is not None:
+            self.on_evict(key, entry[0])
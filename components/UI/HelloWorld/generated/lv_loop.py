@@ -0,0 +1,82 @@
+'''
+Event-driven main loop for gui_guider.py.
+
+Instead of waking every few milliseconds, each pass runs lv.timer_handler(),
+which reports how long until the next LVGL timer (refresh, input read,
+animation) is due, and the loop sleeps exactly that long. wake() cuts the
+sleep short and marks the input devices to be read on the next pass, so a
+touch does not wait out LV_INDEV_DEF_READ_PERIOD. On target, hook it to the
+touch controller interrupt, e.g.
+
+    Pin(14, Pin.IN).irq(lambda pin: event_loop.wake(), Pin.IRQ_FALLING)
+
+run() blocks in utime.sleep_ms(), so there a wake() only takes effect at the
+end of the current sleep; run_async() shares the loop with uasyncio tasks
+and is woken immediately.
+'''
+
+import lvgl as lv
+import utime as time
+
+# Same bounds as EXAMPLE_LVGL_TASK_{MIN,MAX}_DELAY_MS in main.c.
+MIN_SLEEP_MS = 1
+MAX_SLEEP_MS = 500
+
+
+class EventLoop:
+
+    def __init__(self, alive=None, tick_inc=True, min_sleep_ms=MIN_SLEEP_MS, max_sleep_ms=MAX_SLEEP_MS):
+        '''
+        alive() is polled once per pass; the loop ends when it returns False.
+        Pass tick_inc=False when the display driver already advances the
+        LVGL tick (the SDL driver does so from its own thread).
+        '''
+        self.alive = alive
+        self.tick_inc = tick_inc
+        self.min_sleep_ms = min_sleep_ms
+        self.max_sleep_ms = max_sleep_ms
+        self.passes = 0
+        self.woken = False
+        self._flag = None
+        self._last_tick = time.ticks_ms()
+
+    def wake(self):
+        self.woken = True
+        if self._flag is not None:
+            self._flag.set()
+
+    def run_once(self):
+        '''
+        Run due LVGL timers once and return the number of ms to sleep.
+        '''
+        if self.tick_inc:
+            now = time.ticks_ms()
+            elapsed = time.ticks_diff(now, self._last_tick)
+            if elapsed > 0:
+                lv.tick_inc(elapsed)
+                self._last_tick = now
+        if self.woken:
+            self.woken = False
+            indev = lv.indev_get_next(None)
+            while indev:
+                indev.get_read_timer().ready()
+                indev = lv.indev_get_next(indev)
+        delay = lv.timer_handler()
+        self.passes += 1
+        return min(max(delay, self.min_sleep_ms), self.max_sleep_ms)
+
+    def run(self):
+        while self.alive is None or self.alive():
+            time.sleep_ms(self.run_once())
+
+    async def run_async(self):
+        import uasyncio as asyncio
+        self._flag = asyncio.ThreadSafeFlag()
+        try:
+            while self.alive is None or self.alive():
+                try:
+                    await asyncio.wait_for_ms(self._flag.wait(), self.run_once())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._flag = None
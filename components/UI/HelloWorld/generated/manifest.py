@@ -0,0 +1,26 @@
+# Freeze the MicroPython UI into the firmware so its modules are imported as
+# bytecode from flash instead of being compiled from source into the heap:
+#
+#     make -C ports/esp32 BOARD=... FROZEN_MANIFEST=<path to this file>
+#
+# tools/build_mpy.py compiles the same module list to .mpy files for boards
+# whose firmware is not rebuilt. Add module("assets_rom.py") when the asset
+# bundle is written with tools/pack_assets.py --py.
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("gui_guider.py")
+module("fs_driver.py")
+module("asset_bundle.py")
+module("screen_manager.py")
+module("lv_loop.py")
+module("flush_monitor.py")
+module("profiler.py")
+module("imagetools.py")
+module("imagetools_viper.py")
+module("lru_cache.py")
+module("png_stream.py")
+module("anim_batch.py")
+module("digital_clock.py")
+module("date_picker.py")
+module("rle_image.py")
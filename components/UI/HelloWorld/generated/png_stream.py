@@ -0,0 +1,121 @@
+'''
+Row-band PNG decoding for LVGL's read_line interface.
+
+PngStream inflates the IDAT data of an 8-bit RGBA, non-interlaced PNG one
+scanline at a time and keeps the last few converted rows in a small ring.
+Decoding an image then needs the compressed data, the inflate window and
+band_lines rows, instead of the whole RGBA image at once.
+'''
+
+import ustruct as struct
+import uio as io
+import imagetools
+
+try:
+    from deflate import DeflateIO, ZLIB
+
+    def _inflater(stream):
+        return DeflateIO(stream, ZLIB)
+except ImportError:
+    from uzlib import DecompIO
+
+    def _inflater(stream):
+        return DecompIO(stream, 15)
+
+PNG_SIGNATURE = b'\211PNG\r\n\032\n'
+# Window allocated by the inflater, counted in PngStream.size.
+INFLATE_WINDOW = 32 * 1024
+
+
+def _read_idat(data):
+    '''
+    Parse the IHDR chunk and collect the IDAT payload of a PNG held in data.
+    '''
+    if bytes(data[0:8]) != PNG_SIGNATURE or bytes(data[12:16]) != b'IHDR':
+        raise ValueError("not a PNG")
+    width, height, depth, ctype, _, _, interlace = struct.unpack('>IIBBBBB', data[16:29])
+    if depth != 8 or ctype != 6 or interlace:
+        raise ValueError("only 8-bit RGBA non-interlaced PNGs are streamed")
+    # Slices of a memoryview do not copy: each IDAT payload is copied once
+    # into bytes, which io.BytesIO then uses in place on every rewind.
+    data = memoryview(data)
+    chunks = []
+    pos = 8
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        if kind == b'IDAT':
+            chunks.append(bytes(data[pos + 8:pos + 8 + length]))
+        elif kind == b'IEND':
+            break
+        pos += 12 + length
+    if len(chunks) == 1:
+        return width, height, chunks[0]
+    return width, height, b''.join(chunks)
+
+
+class PngStream:
+
+    def __init__(self, data, color_size, swap, band_lines=16):
+        self.width, self.height, self.idat = _read_idat(data)
+        self.color_size = color_size
+        self.swap = swap
+        self.band_lines = band_lines
+        # Bytes per output pixel: RGB565 + alpha or ARGB8888.
+        self.px = 3 if color_size == 2 else 4
+        stride = self.width * 4
+        self.lines = (bytearray(1 + stride), bytearray(1 + stride))
+        self.rows = (memoryview(self.lines[0])[1:], memoryview(self.lines[1])[1:])
+        self.zero = bytearray(stride)
+        self.scratch = bytearray(stride)
+        row_size = self.width * self.px
+        self.scratch_row = memoryview(self.scratch)[:row_size]
+        self.band = bytearray(band_lines * row_size)
+        band = memoryview(self.band)
+        self.slots = [band[i * row_size:(i + 1) * row_size] for i in range(band_lines)]
+        self.size = (len(self.idat) + INFLATE_WINDOW + len(self.band)
+            + 4 * stride)
+        self.decoded = 0
+        self.rewind()
+
+    def rewind(self):
+        self.inflater = _inflater(io.BytesIO(self.idat))
+        self.next_y = 0
+
+    def _read_line(self, line):
+        mv = memoryview(line)
+        got = 0
+        while got < len(line):
+            n = self.inflater.readinto(mv[got:])
+            if not n:
+                raise ValueError("truncated PNG data")
+            got += n
+
+    def _decode_row(self):
+        y = self.next_y
+        cur = y & 1
+        line = self.lines[cur]
+        row = self.rows[cur]
+        self._read_line(line)
+        prev = self.rows[cur ^ 1] if y else self.zero
+        imagetools.png_unfilter(line[0], row, prev, 4)
+        scratch = self.scratch
+        scratch[:] = row
+        if self.color_size == 2:
+            imagetools.rgba8888_to_rgb565a8(scratch, self.swap)
+        else:
+            imagetools.swap_red_blue(scratch)
+        self.slots[y % self.band_lines][:] = self.scratch_row
+        self.next_y = y + 1
+        self.decoded += 1
+
+    def read_line(self, x, y, length, buf):
+        '''
+        Copy length pixels of row y starting at column x into buf, decoding
+        forward as needed. Rows older than the band restart the inflater.
+        '''
+        if y < self.next_y - self.band_lines:
+            self.rewind()
+        while self.next_y <= y:
+            self._decode_row()
+        px = self.px
+        buf[0:length * px] = self.slots[y % self.band_lines][x * px:(x + length) * px]
@@ -0,0 +1,166 @@
+'''
+Optional render profiler for gui_guider.py.
+
+Refreshes (from the display monitor_cb), flushes, input reads and wrapped
+Python callbacks are timestamped into a fixed-size ring buffer, so recording
+does not allocate. show_overlay() puts an FPS / CPU label on the top layer
+and dump() writes the ring as a Chrome trace JSON file (chrome://tracing,
+Perfetto).
+
+Timestamps are raw utime.ticks_us() values and are only compared through
+ticks_diff, so the profiler keeps working after the tick counter wraps.
+'''
+
+import utime as time
+import lvgl as lv
+from uarray import array
+
+KIND_REFRESH = 0
+KIND_FLUSH = 1
+KIND_INPUT = 2
+KIND_CALLBACK = 3
+KIND_NAMES = ('refresh', 'flush', 'input', 'callback')
+
+
+class Profiler:
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.start = array('i', [0] * size)
+        self.dur = array('i', [0] * size)
+        self.kind = bytearray(size)
+        self.name = array('H', [0] * size)
+        self.names = list(KIND_NAMES)
+        self.count = 0
+        self.frames = 0
+        self.busy_us = 0
+        self._window_start = 0
+        self._label = None
+        self._timer = None
+
+    def now(self):
+        return time.ticks_us()
+
+    def record(self, kind, name, start, dur):
+        i = self.count % self.size
+        self.start[i] = start
+        self.dur[i] = dur
+        self.kind[i] = kind
+        self.name[i] = name
+        self.count += 1
+        # Flushes run inside a refresh and are already part of its time.
+        if kind != KIND_FLUSH:
+            self.busy_us += dur
+
+    def name_id(self, name):
+        try:
+            return self.names.index(name)
+        except ValueError:
+            self.names.append(name)
+            return len(self.names) - 1
+
+    def monitor(self, disp_drv, time_ms, px):
+        # monitor_cb: called after each refresh with its duration in ms.
+        dur = time_ms * 1000
+        self.record(KIND_REFRESH, KIND_REFRESH, time.ticks_add(self.now(), -dur), dur)
+        self.frames += 1
+
+    def wrap_flush(self, flush_cb):
+        def flush(disp_drv, area, color_p):
+            t = self.now()
+            flush_cb(disp_drv, area, color_p)
+            self.record(KIND_FLUSH, KIND_FLUSH, t, time.ticks_diff(self.now(), t))
+        return flush
+
+    def wrap_read(self, read_cb):
+        def read(indev_drv, data):
+            t = self.now()
+            res = read_cb(indev_drv, data)
+            self.record(KIND_INPUT, KIND_INPUT, t, time.ticks_diff(self.now(), t))
+            return res
+        return read
+
+    def wrap(self, fn, name=None, argc=1):
+        '''
+        Return fn, which takes argc positional arguments, wrapped so that
+        every call is recorded as a callback. One and two arguments (event
+        handlers, anim exec callbacks, methods) are passed without building
+        an argument tuple; other counts fall back to *args, which allocates.
+        '''
+        name_id = self.name_id(name or fn.__name__)
+        if argc == 1:
+            def traced(a):
+                t = self.now()
+                res = fn(a)
+                self.record(KIND_CALLBACK, name_id, t, time.ticks_diff(self.now(), t))
+                return res
+        elif argc == 2:
+            def traced(a, b):
+                t = self.now()
+                res = fn(a, b)
+                self.record(KIND_CALLBACK, name_id, t, time.ticks_diff(self.now(), t))
+                return res
+        else:
+            def traced(*args):
+                t = self.now()
+                res = fn(*args)
+                self.record(KIND_CALLBACK, name_id, t, time.ticks_diff(self.now(), t))
+                return res
+        return traced
+
+    def show_overlay(self, period=1000):
+        self._label = lv.label(lv.layer_top())
+        self._label.set_style_bg_opa(lv.OPA._50, 0)
+        self._label.set_style_bg_color(lv.color_hex(0x000000), 0)
+        self._label.set_style_text_color(lv.color_hex(0xffffff), 0)
+        self._label.align(lv.ALIGN.BOTTOM_RIGHT, 0, 0)
+        self._label.set_text('-- FPS')
+        self.frames = 0
+        self.busy_us = 0
+        self._window_start = self.now()
+        self._timer = lv.timer_create(self._update_overlay, period, None)
+
+    def _update_overlay(self, timer):
+        now = self.now()
+        elapsed = time.ticks_diff(now, self._window_start)
+        if elapsed <= 0:
+            return
+        fps = self.frames * 1000000 // elapsed
+        cpu = min(self.busy_us * 100 // elapsed, 100)
+        self._label.set_text('%d FPS\n%d%% CPU' % (fps, cpu))
+        self.frames = 0
+        self.busy_us = 0
+        self._window_start = now
+
+    def _origin(self, n):
+        # Start of the oldest recorded event; trace times are relative to it.
+        return self.start[(self.count - n) % self.size] if n else 0
+
+    def events(self):
+        '''
+        Recorded events, oldest first, as (kind, name, start_us, dur_us).
+        start_us counts from the oldest event still in the ring.
+        '''
+        n = min(self.count, self.size)
+        origin = self._origin(n)
+        out = []
+        for j in range(self.count - n, self.count):
+            i = j % self.size
+            out.append((KIND_NAMES[self.kind[i]], self.names[self.name[i]],
+                time.ticks_diff(self.start[i], origin), self.dur[i]))
+        return out
+
+    def dump(self, path):
+        n = min(self.count, self.size)
+        origin = self._origin(n)
+        with open(path, 'w') as f:
+            f.write('{"traceEvents":[')
+            for j in range(self.count - n, self.count):
+                i = j % self.size
+                if j != self.count - n:
+                    f.write(',')
+                f.write('{"name":"%s","cat":"%s","ph":"X","ts":%d,"dur":%d,"pid":0,"tid":%d}' % (
+                    self.names[self.name[i]], KIND_NAMES[self.kind[i]],
+                    time.ticks_diff(self.start[i], origin), self.dur[i], self.kind[i]))
+            f.write(']}')
+        return n
@@ -0,0 +1,67 @@
+'''
+Run-length encoded LVGL images, written by tools/compress_images.py.
+
+Layout (little endian):
+
+    4s  magic b'LVRL'
+    B   version
+    B   cf (lv.img.CF), as in the source .bin
+    B   bytes per pixel
+    B   reserved
+    H   width
+    H   height
+    I * (height + 1)  offset of each line's packets, then the end offset
+
+Each line is a sequence of packets: a control byte c < 128 is followed by
+c + 1 literal pixels, c >= 128 by one pixel repeated c - 127 times. Lines
+are independent, so any line can be expanded on its own into a scratch
+buffer of one line.
+'''
+
+import ustruct as struct
+import imagetools
+
+MAGIC = b'LVRL'
+VERSION = 1
+HEADER_FORMAT = '<4sBBBBHH'
+HEADER_SIZE = 12
+
+
+def read_header(data):
+    '''
+    (cf, px, w, h) of an RLE image, or None when data is not one.
+    '''
+    if len(data) < HEADER_SIZE:
+        return None
+    magic, version, cf, px, _, w, h = struct.unpack_from(HEADER_FORMAT, data, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return cf, px, w, h
+
+
+class RleImage:
+
+    def __init__(self, data):
+        header = read_header(data)
+        if header is None:
+            raise ValueError("not an RLE image")
+        self.cf, self.px, self.w, self.h = header
+        self.data = data
+        self.offsets = struct.unpack_from('<%dI' % (self.h + 1), data, HEADER_SIZE)
+        self.line = bytearray(self.w * self.px)
+        self.line_y = -1
+        self.size = len(data) + len(self.line)
+
+    def read_line(self, x, y, length, buf):
+        '''
+        Copy length pixels of line y starting at column x into buf.
+        '''
+        px = self.px
+        if x == 0 and length == self.w and y != self.line_y:
+            # Whole lines are expanded straight into LVGL's buffer.
+            imagetools.rle_decode_line(self.data, self.offsets[y], self.offsets[y + 1], buf, px)
+            return
+        if y != self.line_y:
+            imagetools.rle_decode_line(self.data, self.offsets[y], self.offsets[y + 1], self.line, px)
+            self.line_y = y
+        buf[0:length * px] = memoryview(self.line)[x * px:(x + length) * px]
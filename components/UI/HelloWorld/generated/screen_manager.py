@@ -0,0 +1,94 @@
+'''
+Lazy screen construction for gui_guider.py, the MicroPython counterpart of
+ui_load_scr_animation() in gui_guider.c. Each screen is registered with a
+factory that builds it on first navigation; screens that are not kept are
+deleted once another screen has been loaded, so only active screens hold RAM.
+
+Resources a factory uses can be held for the lifetime of the screen it
+builds (see hold); on_release is called for each of them once the screen
+object is actually deleted.
+'''
+
+import lvgl as lv
+
+
+class ScreenManager:
+
+    def __init__(self):
+        self.factories = {}
+        self.keep = {}
+        self.screens = {}
+        self.active = None
+        # Optional on_load(old_name, new_name), called before each load.
+        self.on_load = None
+        # Optional on_release(key), called for every key a screen held.
+        self.on_release = None
+        # Keys held by the screen whose factory is running.
+        self.building = None
+
+    def register(self, name, factory, keep=False):
+        '''
+        factory() must create and return the screen object. With keep=True
+        the screen survives being navigated away from.
+        '''
+        self.factories[name] = factory
+        self.keep[name] = keep
+
+    def get(self, name):
+        scr = self.screens.get(name)
+        if scr is None:
+            # Each screen instance gets its own list: during an auto_del
+            # animation the old instance of a screen can still be alive
+            # when a new one is built under the same name.
+            keys = []
+            self.building = keys
+            try:
+                scr = self.factories[name]()
+            finally:
+                self.building = None
+            scr.add_event_cb(lambda e: self._release(keys), lv.EVENT.DELETE, None)
+            self.screens[name] = scr
+        return scr
+
+    def hold(self, key):
+        '''
+        Tie key to the screen whose factory is running. Returns False when
+        no screen is being built, in which case nothing will release it.
+        '''
+        if self.building is None:
+            return False
+        self.building.append(key)
+        return True
+
+    def _release(self, keys):
+        if self.on_release is not None:
+            for key in keys:
+                self.on_release(key)
+        keys.clear()
+
+    def load(self, name, anim_type=lv.SCR_LOAD_ANIM.NONE, time=0, delay=0):
+        if name == self.active:
+            return self.screens[name]
+        old = self.active
+        if self.on_load is not None:
+            self.on_load(old, name)
+        scr = self.get(name)
+        auto_del = old is not None and not self.keep[old]
+        if auto_del:
+            old_scr = self.screens.pop(old)
+        if anim_type == lv.SCR_LOAD_ANIM.NONE and not time and not delay:
+            lv.scr_load(scr)
+            if auto_del:
+                old_scr.delete()
+        else:
+            # LVGL deletes the old screen itself once the animation is done.
+            lv.scr_load_anim(scr, anim_type, time, delay, auto_del)
+        self.active = name
+        return scr
+
+    def drop(self, name):
+        '''
+        Delete an inactive screen now, whatever its keep policy.
+        '''
+        if name != self.active and name in self.screens:
+            self.screens.pop(name).delete()
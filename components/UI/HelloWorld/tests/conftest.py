@@ -0,0 +1,17 @@
+'''
+The tests run the pure-Python helpers from ../generated and the converters
+from ../tools under CPython, e.g.
+
+    python -m pytest components/UI/HelloWorld/tests
+
+MicroPython's u-prefixed modules are mapped to their CPython counterparts;
+modules that need lvgl get a small stand-in from the test itself.
+'''
+
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generated'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+sys.modules.setdefault('ustruct', struct)
@@ -0,0 +1,148 @@
+import sys
+import types
+
+
+class Obj:
+
+    def __init__(self, parent=None, text=''):
+        self.parent = parent
+        self.flags = set()
+        self.event_cbs = []
+        self.text = text
+        self.deleted = False
+        self.bg_opa = None
+
+    def get_screen(self):
+        obj = self
+        while obj.parent is not None:
+            obj = obj.parent
+        return obj
+
+    def get_disp(self):
+        return disp
+
+    def get_width(self):
+        return 240
+
+    def get_height(self):
+        return 280
+
+    def get_text(self):
+        return self.text
+
+    def set_text(self, text):
+        self.text = text
+
+    def add_flag(self, flag):
+        self.flags.add(flag)
+
+    def clear_flag(self, flag):
+        self.flags.discard(flag)
+
+    def set_style_bg_opa(self, opa, selector):
+        self.bg_opa = opa
+
+    def add_event_cb(self, cb, code, user_data):
+        self.event_cbs.append((cb, code))
+
+    def delete(self):
+        for cb, code in self.event_cbs:
+            if code == lv.EVENT.DELETE:
+                cb(None)
+        self.deleted = True
+
+
+class Calendar(Obj):
+
+    def __init__(self, parent):
+        Obj.__init__(self, parent)
+        self.pressed = None
+        self.size = None
+
+    def set_showed_date(self, year, month):
+        self.showed = (year, month)
+
+    def set_highlighted_dates(self, dates, count):
+        self.highlighted = [(d.year, d.month, d.day) for d in dates[:count]]
+
+    def set_size(self, w, h):
+        self.size = (w, h)
+
+    def align(self, align, x, y):
+        pass
+
+    def get_pressed_date(self, date):
+        if self.pressed is None:
+            return lv.RES.INV
+        date.year, date.month, date.day = self.pressed
+        return lv.RES.OK
+
+
+class CalendarDate:
+    year = month = day = 0
+
+
+lv = types.ModuleType('lvgl')
+lv.EVENT = types.SimpleNamespace(DELETE=1, VALUE_CHANGED=2, FOCUSED=3)
+lv.RES = types.SimpleNamespace(OK=1, INV=0)
+lv.ALIGN = types.SimpleNamespace(CENTER=9)
+lv.OPA = types.SimpleNamespace(TRANSP=0)
+lv.obj = types.SimpleNamespace(FLAG=types.SimpleNamespace(HIDDEN='hidden', CLICKABLE='clickable'))
+lv.calendar = Calendar
+lv.calendar_date_t = CalendarDate
+lv.calendar_header_arrow = lambda calendar: None
+top_layer = Obj()
+disp = object()
+lv.disp_get_layer_top = lambda d: top_layer
+sys.modules.setdefault('lvgl', lv)
+
+import date_picker
+
+
+def test_show_pick_and_delete():
+    scr = Obj()
+    text = Obj(scr, '2023/5/17')
+    picker = date_picker.get(scr)
+    assert date_picker.get(scr) is picker
+    assert picker.calendar.parent is top_layer
+    assert 'hidden' in picker.calendar.flags
+
+    picker.show(text)
+    assert 'hidden' not in picker.calendar.flags
+    assert 'clickable' in top_layer.flags
+    assert picker.calendar.showed == (2023, 5)
+    assert picker.calendar.highlighted == [(2023, 5, 17)]
+    assert picker.calendar.size == (192, 224)
+
+    assert not picker.pick()
+    picker.calendar.pressed = (2024, 2, 29)
+    assert picker.pick()
+    assert text.text == '2024/2/29'
+    assert picker.target is None
+    assert 'hidden' in picker.calendar.flags
+    assert 'clickable' not in top_layer.flags
+    # Picking again without a target does nothing.
+    assert not picker.pick()
+
+    picker.show(text)
+    assert picker.calendar.highlighted == [(2024, 2, 29)]
+    calendar = picker.calendar
+    scr.delete()
+    assert calendar.deleted
+    assert scr not in date_picker.pickers
+    assert 'clickable' not in top_layer.flags
+
+
+def test_pickers_are_per_screen():
+    scr_a = Obj()
+    scr_b = Obj()
+    a = date_picker.get(scr_a)
+    b = date_picker.get(scr_b)
+    assert a is not b
+    b.show(Obj(scr_b, '2020/1/1'))
+    # Deleting a screen whose picker is hidden leaves the other one open.
+    scr_a.delete()
+    assert 'clickable' in top_layer.flags
+    assert date_picker.get(scr_b) is b
+    scr_b.delete()
+    assert not date_picker.pickers
@@ -0,0 +1,83 @@
+import pytest
+
+from digital_clock import DigitalClock
+
+
+class Label:
+
+    def __init__(self):
+        self.text = None
+
+    def set_text(self, text):
+        self.text = text
+
+    def set_text_static(self, text):
+        self.text = bytes(text[:text.index(0)]).decode()
+
+
+def reference_clock_cb(obj, current_time, show_second, use_ampm):
+    # digital_clock_cb as generated before DigitalClock replaced it.
+    hour = int(current_time[0])
+    minute = int(current_time[1])
+    second = int(current_time[2])
+    ampm = current_time[3]
+    second = second + 1
+    if second == 60:
+        second = 0
+        minute = minute + 1
+        if minute == 60:
+            minute = 0
+            hour = hour + 1
+            if use_ampm:
+                if hour == 12:
+                    if ampm == 'AM':
+                        ampm = 'PM'
+                    elif ampm == 'PM':
+                        ampm = 'AM'
+                if hour > 12:
+                    hour = hour % 12
+    hour = hour % 24
+    if use_ampm:
+        if show_second:
+            obj.set_text("%d:%02d:%02d %s" %(hour, minute, second, ampm))
+        else:
+            obj.set_text("%d:%02d %s" %(hour, minute, ampm))
+    else:
+        if show_second:
+            obj.set_text("%d:%02d:%02d" %(hour, minute, second))
+        else:
+            obj.set_text("%d:%02d" %(hour, minute))
+    current_time[0] = hour
+    current_time[1] = minute
+    current_time[2] = second
+    current_time[3] = ampm
+
+
+def run_cycle(start, seconds, show_second, use_ampm):
+    expected = Label()
+    actual = Label()
+    current_time = list(start)
+    clock = DigitalClock(actual, *start, show_second, use_ampm)
+    for i in range(seconds):
+        reference_clock_cb(expected, current_time, show_second, use_ampm)
+        clock.tick()
+        assert actual.text == expected.text, 'after %d s from %r' % (i + 1, start)
+        state = clock.state
+        assert ((state >> 16) & 0xff, (state >> 8) & 0xff, state & 0xff,
+                clock.ampm[state >> 24]) == tuple(current_time)
+
+
+@pytest.mark.parametrize('show_second', [True, False])
+def test_24h_cycle(show_second):
+    run_cycle((23, 59, 30, 'AM'), 24 * 3600, show_second, False)
+
+
+@pytest.mark.parametrize('show_second', [True, False])
+@pytest.mark.parametrize('start', [(11, 59, 30, 'AM'), (12, 0, 0, 'PM'), (9, 5, 7, 'PM')])
+def test_12h_cycle(start, show_second):
+    # Two 12 h periods, so both the AM -> PM and PM -> AM roll-overs are seen.
+    run_cycle(start, 24 * 3600, show_second, True)
+
+
+def test_other_suffix_is_kept():
+    run_cycle((11, 59, 0, 'h'), 2 * 3600, True, True)
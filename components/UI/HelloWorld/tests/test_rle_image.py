@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import compress_images
+import rle_image
+
+
+def image(w, h, px, seed):
+    # Runs of repeated pixels mixed with noise, so both packet kinds occur,
+    # including runs and literals longer than one packet.
+    rng = random.Random(seed)
+    out = bytearray()
+    for _ in range(h):
+        line = bytearray()
+        while len(line) < w * px:
+            pixel = bytes(rng.randrange(256) for _ in range(px))
+            count = rng.choice((1, 1, 2, 3, 40, 200))
+            line += pixel * count if rng.random() < 0.5 else bytes(rng.randrange(256) for _ in range(px * count))
+        out += line[:w * px]
+    return bytes(out)
+
+
+@pytest.mark.parametrize('px', [2, 3, 4])
+def test_round_trip(px):
+    w, h = 300, 7
+    pixels = image(w, h, px, px)
+    blob = compress_images.encode(compress_images.CF_TRUE_COLOR_ALPHA, w, h, px, pixels)
+    assert rle_image.read_header(blob) == (compress_images.CF_TRUE_COLOR_ALPHA, px, w, h)
+    img = rle_image.RleImage(blob)
+    stride = w * px
+    for y in range(h):
+        buf = bytearray(stride)
+        img.read_line(0, y, w, buf)
+        assert bytes(buf) == pixels[y * stride:(y + 1) * stride]
+
+
+@pytest.mark.parametrize('x, length', [(1, 10), (129, 150), (299, 1), (0, 17)])
+def test_partial_lines(x, length):
+    w, h, px = 300, 5, 3
+    pixels = image(w, h, px, 7)
+    img = rle_image.RleImage(compress_images.encode(compress_images.CF_TRUE_COLOR, w, h, px, pixels))
+    # Same line twice (served from the expanded line), then the next lines.
+    for y in (2, 2, 3, 0):
+        buf = bytearray(length * px)
+        img.read_line(x, y, length, buf)
+        start = y * w * px + x * px
+        assert bytes(buf) == pixels[start:start + length * px]
+
+
+def test_rgb565_conversion():
+    # One BGRA pixel: r=0xf0, g=0x20, b=0x10, a=0x80.
+    assert compress_images.to_rgb565(bytes([0x10, 0x20, 0xf0, 0x80]), True, True) == bytes([0xf1, 0x02, 0x80])
+    assert compress_images.to_rgb565(bytes([0x10, 0x20, 0xf0, 0x80]), False, False) == bytes([0x02, 0xf1])
+
+
+def test_not_an_rle_image():
+    assert rle_image.read_header(b'LVRL') is None
+    with pytest.raises(ValueError):
+        rle_image.RleImage(b'\x00' * 32)
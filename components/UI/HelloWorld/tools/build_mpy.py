@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compile the MicroPython UI modules to .mpy bytecode with mpy-cross.
+
+    python3 build_mpy.py ../generated -o ../generated/mpy --march xtensawin
+
+The modules are those listed in the directory's manifest.py, the same list
+that is frozen into the firmware. Copy the output to the board ahead of the
+sources (or put its directory first on sys.path): importing a .mpy skips
+compiling gui_guider.py on the device, which saves both the compile time and
+the heap the compiler needs. Files whose .mpy is newer than the source are
+skipped. --march is needed for imagetools_viper.py, whose viper functions
+are compiled to machine code (xtensawin for the ESP32-S3).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+MODULE_RE = re.compile(r'^module\("([^"]+)"\)', re.M)
+
+
+def read_manifest(src_dir):
+    with open(os.path.join(src_dir, "manifest.py")) as f:
+        return MODULE_RE.findall(f.read())
+
+
+def compile_module(mpy_cross, src, dst, march):
+    cmd = [mpy_cross, "-O1", "-o", dst]
+    if march:
+        cmd.append("-march=" + march)
+    cmd.append(src)
+    subprocess.run(cmd, check=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("src_dir", help="directory holding manifest.py and the modules")
+    parser.add_argument("-o", "--output", required=True, help="directory for the .mpy files")
+    parser.add_argument("--march", help="native emitter architecture, e.g. xtensawin")
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross executable")
+    parser.add_argument("-f", "--force", action="store_true", help="rebuild even if up to date")
+    args = parser.parse_args(argv)
+
+    modules = read_manifest(args.src_dir)
+    if not modules:
+        sys.exit("no modules listed in %s/manifest.py" % args.src_dir)
+    os.makedirs(args.output, exist_ok=True)
+    built = 0
+    for name in modules:
+        src = os.path.join(args.src_dir, name)
+        dst = os.path.join(args.output, os.path.splitext(name)[0] + ".mpy")
+        if (not args.force and os.path.exists(dst)
+                and os.path.getmtime(dst) >= os.path.getmtime(src)):
+            continue
+        compile_module(args.mpy_cross, src, dst, args.march)
+        print("%s -> %s: %d bytes" % (src, dst, os.path.getsize(dst)))
+        built += 1
+    print("%s: %d of %d modules rebuilt" % (args.output, built, len(modules)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the lv_micropython unix port with the board's 16-bit color depth.
+
+    python3 build_simulator.py ~/lv_micropython
+    cd ../generated && ~/lv_micropython/ports/unix/build-lvgl16/micropython gui_guider.py
+
+The stock unix port is built with LV_COLOR_DEPTH=32, so the simulator would
+draw, decode and flush 4 bytes per pixel where the board (sdkconfig
+CONFIG_LV_COLOR_DEPTH_16) uses 2. This builds a separate interpreter with
+LV_COLOR_DEPTH=16 into its own build directory, leaving the default build
+alone; gui_guider.py follows the depth the binding was built with. --swap
+adds LV_COLOR_16_SWAP=1 like CONFIG_LV_COLOR_16_SWAP: memory and timing then
+match the board exactly, but the SDL window shows the bytes swapped, so
+leave it off to check colors. make skips the build when it is up to date.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("lv_micropython", help="lv_micropython checkout")
+    parser.add_argument("--color-depth", type=int, default=16, choices=(16, 32),
+                        help="LV_COLOR_DEPTH of the build (default: 16, as on the board)")
+    parser.add_argument("--swap", action="store_true", help="also set LV_COLOR_16_SWAP=1")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="parallel make jobs")
+    args = parser.parse_args(argv)
+
+    port_dir = os.path.join(args.lv_micropython, "ports", "unix")
+    if not os.path.isdir(port_dir):
+        sys.exit("%s is not an lv_micropython checkout" % args.lv_micropython)
+    if args.swap and args.color_depth != 16:
+        sys.exit("--swap needs --color-depth 16")
+    cflags = "-DLV_COLOR_DEPTH=%d" % args.color_depth
+    build = "build-lvgl%d" % args.color_depth
+    if args.swap:
+        cflags += " -DLV_COLOR_16_SWAP=1"
+        build += "-swap"
+    subprocess.run(["make", "-C", port_dir, "-j%d" % args.jobs,
+                    "BUILD=" + build, "LV_CFLAGS=" + cflags], check=True)
+    print("simulator: %s" % os.path.join(port_dir, build, "micropython"))
+
+
+if __name__ == "__main__":
+    main()
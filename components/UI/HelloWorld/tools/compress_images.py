@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Convert LVGL true color .bin images to the run-length encoded .rle format.
+
+    python3 compress_images.py ../generated/MicroPython --swap
+
+Every .bin in the directory is written as <name>.rle next to it (or into
+-o). load_image in gui_guider.py uses the .rle in place of the .bin it was
+asked for, and the decoder expands it a line at a time when drawn, so flat
+color images cost a fraction of their raw size in flash and in reads. The
+format is described in generated/rle_image.py. Pixels are written for the
+board's 16-bit build: 32-bit sources are converted to RGB565 (--swap for
+LV_COLOR_16_SWAP). Pass --color-depth 32 to keep them as they are for the
+stock 32-bit simulator. gui_guider.py ignores a .rle whose pixel size does
+not match the running build and loads the .bin. Files whose .rle is newer
+than the .bin are skipped.
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+MAGIC = b"LVRL"
+VERSION = 1
+HEADER_FORMAT = "<4sBBBBHH"
+MAX_PACKET = 128
+
+CF_TRUE_COLOR = 4
+CF_TRUE_COLOR_ALPHA = 5
+CF_TRUE_COLOR_CHROMA_KEYED = 6
+
+
+def read_bin(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    (header,) = struct.unpack_from("<L", data, 0)
+    cf, w, h = header & 0x1F, (header >> 10) & 0x7FF, (header >> 21) & 0x7FF
+    if cf not in (CF_TRUE_COLOR, CF_TRUE_COLOR_ALPHA, CF_TRUE_COLOR_CHROMA_KEYED):
+        raise ValueError("%s: color format %d is not a true color format" % (path, cf))
+    if not w or not h or (len(data) - 4) % (w * h):
+        raise ValueError("%s: size does not match %dx%d" % (path, w, h))
+    return cf, w, h, (len(data) - 4) // (w * h), data[4:]
+
+
+def to_rgb565(pixels, alpha, swap):
+    """32-bit BGRA/BGRX pixels to RGB565, followed by the alpha byte if alpha."""
+    out = bytearray()
+    for i in range(0, len(pixels), 4):
+        b, g, r = pixels[i], pixels[i + 1], pixels[i + 2]
+        c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        out += struct.pack(">H" if swap else "<H", c)
+        if alpha:
+            out.append(pixels[i + 3])
+    return bytes(out)
+
+
+def encode_line(line, px):
+    pixels = [line[i:i + px] for i in range(0, len(line), px)]
+    out = bytearray()
+    literal = []
+
+    def flush_literal():
+        while literal:
+            chunk = literal[:MAX_PACKET]
+            del literal[:MAX_PACKET]
+            out.append(len(chunk) - 1)
+            out.extend(b"".join(chunk))
+
+    i = 0
+    while i < len(pixels):
+        run = 1
+        while i + run < len(pixels) and run < MAX_PACKET and pixels[i + run] == pixels[i]:
+            run += 1
+        if run >= 2:
+            flush_literal()
+            out.append(127 + run)
+            out.extend(pixels[i])
+        else:
+            literal.append(pixels[i])
+        i += run
+    flush_literal()
+    return bytes(out)
+
+
+def encode(cf, w, h, px, pixels):
+    lines = [encode_line(pixels[y * w * px:(y + 1) * w * px], px) for y in range(h)]
+    offset = struct.calcsize(HEADER_FORMAT) + 4 * (h + 1)
+    offsets = []
+    for line in lines:
+        offsets.append(offset)
+        offset += len(line)
+    offsets.append(offset)
+    return (struct.pack(HEADER_FORMAT, MAGIC, VERSION, cf, px, 0, w, h)
+            + struct.pack("<%dI" % (h + 1), *offsets) + b"".join(lines))
+
+
+def convert(src, dst, color_depth, swap):
+    cf, w, h, px, pixels = read_bin(src)
+    raw = 4 + len(pixels)
+    if color_depth == 16 and px == 4:
+        alpha = cf == CF_TRUE_COLOR_ALPHA
+        pixels = to_rgb565(pixels, alpha, swap)
+        px = 3 if alpha else 2
+    blob = encode(cf, w, h, px, pixels)
+    with open(dst, "wb") as f:
+        f.write(blob)
+    return raw, len(blob)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("image_dir", help="directory holding the .bin images")
+    parser.add_argument("-o", "--output", help="directory for the .rle files (default: image_dir)")
+    parser.add_argument("--color-depth", type=int, default=16, choices=(16, 32),
+                        help="LV_COLOR_DEPTH to write pixels for (default: 16, as on the board)")
+    parser.add_argument("--swap", action="store_true", help="byte-swap RGB565 (LV_COLOR_16_SWAP)")
+    parser.add_argument("-f", "--force", action="store_true", help="rewrite even if up to date")
+    args = parser.parse_args(argv)
+
+    out_dir = args.output or args.image_dir
+    os.makedirs(out_dir, exist_ok=True)
+    names = sorted(n for n in os.listdir(args.image_dir) if n.endswith(".bin"))
+    if not names:
+        sys.exit("no .bin images in %s" % args.image_dir)
+    for name in names:
+        src = os.path.join(args.image_dir, name)
+        dst = os.path.join(out_dir, name[:-4] + ".rle")
+        if (not args.force and os.path.exists(dst)
+                and os.path.getmtime(dst) >= os.path.getmtime(src)):
+            print("%s: up to date" % dst)
+            continue
+        try:
+            raw, packed = convert(src, dst, args.color_depth, args.swap)
+        except ValueError as e:
+            print("skipped %s" % e)
+            continue
+        print("%s: %d -> %d bytes (%.0f%%)" % (dst, raw, packed, 100.0 * packed / raw))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Pack the GUI Guider MicroPython assets into a single read-only bundle.
+
+    python3 pack_assets.py ../generated/MicroPython -o ../generated/MicroPython/assets.bundle
+
+Entries are named by their path relative to the parent of the asset
+directory ("MicroPython/<file>"), matching the paths used in gui_guider.py,
+and carry their format and sha256. When the existing bundle already holds
+the same names and hashes nothing is rewritten, so an unchanged project does
+not trigger a firmware rebuild. With --py a Python module exposing the blob
+as BLOB is written as well; freeze it into the firmware as assets_rom.py so
+the bundle stays in flash.
+"""
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+MAGIC = b"LVAB"
+VERSION = 2
+ALIGN = 4
+HEADER_FORMAT = "<4sHH"
+ENTRY_FORMAT = "<IIB32s"
+
+FMT_RAW = 0
+FMT_LV_IMG = 1
+FMT_PNG = 2
+FMT_LV_FONT = 3
+FMT_LV_RLE = 4
+FORMATS = {".bin": FMT_LV_IMG, ".png": FMT_PNG, ".fnt": FMT_LV_FONT, ".rle": FMT_LV_RLE}
+
+
+def collect(asset_dir):
+    prefix = os.path.basename(os.path.normpath(asset_dir))
+    entries = []
+    for name in sorted(os.listdir(asset_dir)):
+        path = os.path.join(asset_dir, name)
+        fmt = FORMATS.get(os.path.splitext(name)[1])
+        if fmt is not None and os.path.isfile(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            entries.append((prefix + "/" + name, fmt, hashlib.sha256(data).digest(), data))
+    return entries
+
+
+def read_index(path):
+    """Return [(name, format, sha256)] of an existing bundle, or None."""
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+        magic, version, count = struct.unpack_from(HEADER_FORMAT, blob, 0)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION:
+        return None
+    index = []
+    pos = struct.calcsize(HEADER_FORMAT)
+    for _ in range(count):
+        (name_len,) = struct.unpack_from("<H", blob, pos)
+        name = blob[pos + 2:pos + 2 + name_len].decode()
+        pos += 2 + name_len
+        _, _, fmt, digest = struct.unpack_from(ENTRY_FORMAT, blob, pos)
+        pos += struct.calcsize(ENTRY_FORMAT)
+        index.append((name, fmt, digest))
+    return index
+
+
+def pack(entries):
+    entry_size = struct.calcsize(ENTRY_FORMAT)
+    offset = struct.calcsize(HEADER_FORMAT) + sum(2 + len(e[0].encode()) + entry_size for e in entries)
+    header = [struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(entries))]
+    payload = []
+    for name, fmt, digest, data in entries:
+        pad = -offset % ALIGN
+        payload.append(b"\0" * pad)
+        offset += pad
+        encoded = name.encode()
+        header.append(struct.pack("<H", len(encoded)) + encoded
+                      + struct.pack(ENTRY_FORMAT, offset, len(data), fmt, digest))
+        payload.append(data)
+        offset += len(data)
+    return b"".join(header + payload)
+
+
+def write_module(blob, path):
+    with open(path, "w") as f:
+        f.write("# Generated by tools/pack_assets.py, do not edit.\n")
+        f.write("BLOB = %r\n" % blob)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("asset_dir", help="directory holding the .bin/.rle/.fnt/.png assets")
+    parser.add_argument("-o", "--output", required=True, help="bundle file to write")
+    parser.add_argument("--py", help="also write the blob as a freezable Python module")
+    parser.add_argument("-f", "--force", action="store_true", help="rewrite even if nothing changed")
+    args = parser.parse_args(argv)
+
+    entries = collect(args.asset_dir)
+    if not entries:
+        sys.exit("no assets found in %s" % args.asset_dir)
+    index = [(name, fmt, digest) for name, fmt, digest, _ in entries]
+    up_to_date = not args.force and read_index(args.output) == index
+    if up_to_date and (not args.py or os.path.exists(args.py)):
+        print("%s: up to date (%d entries)" % (args.output, len(entries)))
+        return
+
+    blob = pack(entries)
+    with open(args.output, "wb") as f:
+        f.write(blob)
+    if args.py:
+        write_module(blob, args.py)
+    print("%s: %d entries, %d bytes" % (args.output, len(entries), len(blob)))
+
+
+if __name__ == "__main__":
+    main()